@@ -1,552 +1,773 @@
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
 import re
-from collections import defaultdict
-
-def analyze_log_file(log_file_path):
-    # Initialize variables
-    custom_config_found = False
-    last_core_index = -1
-    critical_issues = defaultdict(list)
-    game_issues = defaultdict(list)
-    non_default_settings = defaultdict(list)
-    pad_info = defaultdict(list)
-    pad_issues = defaultdict(list)
-    firmware_detected = False
-    firmware_version = None
-    local_build_detected = False
-    emulator_info = {"version": "", "cpu": "", "os": "", "gpu": ""}
-    language_message = ""
-    call_stack = []
-    thread_context = []
-    
-    # Sets to track duplicate issues
-    onedrive_install = set()
-    programfiles_install = set()
-    save_issues = set()
-    graphics_device_notifications = set()
-
-    # Attempt to open and read the log file with different encodings
+import time
+from array import array
+from collections import defaultdict, namedtuple
+
+# Summary sections, keyed the same way throughout the rule tables below
+CRITICAL = "critical"
+WARNING = "warning"
+NON_DEFAULT = "non_default"
+PAD_ISSUE = "pad_issue"
+PAD_INFO = "pad_info"
+
+# Headings in the order the summary lists them; Input Info comes after the
+# "no issues" note, which only looks at the first four
+SECTION_HEADINGS = {
+    CRITICAL: "## Critical :exclamation:\n_Guaranteed to be a problem!_\n",
+    WARNING: "\n## Warning :warning:\n_May or may not cause issues._\n",
+    NON_DEFAULT: "\n## Non-default settings :question:\n_Set these in Rock Band 3's Custom Configuration. Use `!global` for more information._\n",
+    PAD_ISSUE: "\n## Input Errors :guitar:\n_Here's some problems with your controllers._\n",
+    PAD_INFO: "\n## Input Info :guitar:\n_Here's some pad and I/O information._\n",
+}
+SECTIONS = tuple(SECTION_HEADINGS)
+NO_ISSUES_MESSAGE = "## No issues detected. Either nothing is wrong or I don't know how to detect your issue yet."
+
+# Issues seen on more lines than this are summarized as first..last and a count
+MAX_LISTED_LINES = 10
+
+def line_numbers():
+    """Compact storage for the line numbers of an issue, 4 bytes per hit."""
+    return array("I")
+
+def count_distinct_lines(lines):
+    """Distinct line numbers in `lines`; they are recorded in order, so repeats are adjacent."""
+    return sum(1 for previous, line in zip(itertools.chain((None,), lines), lines) if line != previous)
+
+def format_line_refs(lines):
+    """(on ...) part of a summary line: each line, or a range plus count once there are many."""
+    # A line two rules fire on for the same issue (OpenGL) is recorded twice but is one hit
+    hits = count_distinct_lines(lines)
+    if hits > MAX_LISTED_LINES:
+        return f"L-{lines[0]}..L-{lines[-1]}, {hits:,} hits"
+    return ", ".join(f"L-{line}" for line in lines)
+
+# A core-section rule fires once per line containing any of its literals.
+# It either records a hit for (section, message), raises a flag used by the
+# combined checks, or both. Rules with a `check` callable look at the line
+# themselves and return (issue_id, section, message, flag) or None.
+# `issue_id` names the issue independently of its wording.
+Rule = namedtuple("Rule", ["literals", "section", "message", "flag", "check", "issue_id"], defaults=(None, None, None, None, None))
+
+_FIRST_NUMBER_RE = re.compile(r"\d+")
+_VBLANK_RE = re.compile(r"Vblank Rate: (\d+)")
+_AUDIO_BUFFER_RE = re.compile(r"Desired Audio Buffer Duration: (\d+)")
+_WAKEUP_DELAY_RE = re.compile(r"Driver Wake-Up Delay: (\d+)")
+_FIRMWARE_RE = re.compile(r"SYS: Firmware version: (\d+\.\d+)")
+_GPU_RE = re.compile(r"Default GPU: '(.*)'")
+_VERSION_RE = re.compile(r"RPCS3 v0\.0\.\d+-(\d+)-[a-f0-9]+")
+_THREAD_CONTEXT_RE = re.compile(r"thread context:", re.IGNORECASE)
+
+def _check_vblank(line):
+    if not _VBLANK_RE.search(line):
+        return None
+    # The value is the first number on the line (config dump lines have no timestamp)
+    vblank_frequency = int(_FIRST_NUMBER_RE.search(line).group())
+    if vblank_frequency < 60:
+        return "vblank_below_60", CRITICAL, f"- **VBlank should not be below 60**. Set it back to 60 in the Advanced tab of RB3's Custom Configuration.", None
+    if vblank_frequency > 60:
+        return "vblank_above_60", WARNING, f"- Playing on a VBlank higher than 60 is not suggested. Use `!vsyncmeta` for more information.", "above60_vblank"
+    return None
+
+def _check_audio_buffer(line):
+    match = _AUDIO_BUFFER_RE.search(line)
+    if match:
+        buffer_duration = int(match.group(1))
+        if buffer_duration >= 100:
+            return "audio_buffer_high", WARNING, f"- **Audio Buffer is quite high.** Consider lowering it to 32 in the Audio tab of RB3's Custom Configuration. It's set to {buffer_duration} ms", None
+    return None
+
+def _check_wakeup_delay(line):
+    if not _WAKEUP_DELAY_RE.search(line):
+        return None
+    delay_value = int(_FIRST_NUMBER_RE.search(line).group())
+    if delay_value < 20:
+        return "wakeup_delay_too_low", CRITICAL, f"- **Driver Wake-Up Delay is too low.** Yours is set to ({delay_value}). Use `!dwd`", None
+    if delay_value % 20 != 0:
+        return "wakeup_delay_not_multiple_of_20", WARNING, f"- **Driver Delay Wake-Up Settings isn't a multiple of 20**. Yours is at (value: {delay_value}). Use `!dwd`", None
+    return None
+
+# Checks run on every line from the last "Used configuration" onwards, in this order
+CORE_RULES = (
+    # High memory
+    Rule(('CELL_ENOENT, "/dev_hdd0/game/BLUS30463/USRDIR/dx_high_memory.dta"',), CRITICAL, f"- **High memory file is missing!** Check out `!mem` for more information.", issue_id="high_memory_missing"),
+    # Frame limit
+    Rule(("Frame limit: Infinite", "Frame limit: 50", "Frame limit: 30", "Frame limit: PS3 Native"), CRITICAL, f"- **You are using an unsupported Framelimit value!** Set this back to 60, Display, or Off.", issue_id="unsupported_frame_limit"),
+    # OpenGL Detect
+    Rule(("Renderer: OpenGL",), WARNING, f"- **You're using OpenGL!** You should really be on Vulkan. Set this in the GPU tab of RB3's Custom Configuration.", issue_id="opengl_renderer"),
+    # Presence Crash Detect
+    Rule(("{\\qPlaylist\\q:\\q,\\qSubPlaylist\\",), CRITICAL, f"- **Error writing to Presence file!** You'll need to delete all files called `currentsong.json` in RB3's USRDIR folder. `!gamedata`", issue_id="presence_write_error"),
+    # 1920x1080 Detect
+    Rule(("Resolution: 1920x1080",), CRITICAL, f"- **Forcing Rock Band to run at 1920x1080 will cause crashes!** You should really set this back to 1280x720 in the GPU section of RB3's custom configuration.", issue_id="forced_1080p"),
+    # OneDrive install detection
+    Rule(("OneDrive",), CRITICAL, f"- **OneDrive detected! This can lead to corrupted files and saves!** Please move files to `C:\\Games`", issue_id="onedrive_install"),
+    # Program Files install detection
+    Rule(("Program Files",), CRITICAL, f"- **Program Files install detected! This can lead to issues due to permissions!** Please move files to `C:\\Games`", issue_id="program_files_install"),
+    # Busted save
+    Rule(("dev_hdd0/home/00000001/savedata/BLUS30463-AUTOSAVE/ (Already exists)",), CRITICAL, f"- **Busted save detected!** Move the `BLUS30463-AUTOSAVE` folder out of `dev_hdd0\\home\\00000001\\savedata`.", issue_id="busted_save"),
+    # Vblank Rate
+    Rule(("Vblank Rate: ",), check=_check_vblank),
+    # VSync False
+    Rule(("VSync: false",), flag="vsync_off"),
+    # OpenGL
+    Rule(("Renderer: OpenGL",), WARNING, f"- **You're using OpenGL!** You should really be on Vulkan. Set this in the GPU tab of RB3's Custom Configuration.", issue_id="opengl_renderer"),
+    # High Audio Buffer Duration
+    Rule(("Desired Audio Buffer Duration: ",), check=_check_audio_buffer),
+    # Audio Broken
+    Rule(("cellAudio: Failed to open audio backend", "Thread terminated due to fatal error: Unsupported layout"), CRITICAL, f"- **Audio device doesn't work!** Check to make you selected the proper audio device in the Audio tab of RB3's Custom Configuration.", issue_id="audio_device_broken"),
+    # Fullscreen settings
+    Rule(("Exclusive Fullscreen Mode: Enable", "Exclusive Fullscreen Mode: Automatic"), WARNING, f"- Depending on your graphics driver, **you may experience issues with the Automatic or Exclusive Fullscreen settings** when clicking in and out of RPCS3. Consider setting it to `Prefer Borderless Fullscreen` in the Advanced tab of RB3's Custom Configuration.", issue_id="fullscreen_mode"),
+    # Shader Compilation Broke
+    Rule(("Shader does not write to any output register and will be NOPed",), CRITICAL, f"- **Shader compilation failed!** Clear the cache and update RPCS3 if you haven't. Use `!caches` for more information.", issue_id="shader_compilation_failed"),
+    # Vulkan Device Lost
+    Rule(("Driver crashed with unspecified error or stopped responding and recovered",), CRITICAL, f"- **Display error!** Check your graphics card drivers. Use `!vkdiag` for more information.", issue_id="vulkan_device_lost"),
+    # PSF Broken
+    Rule(("PSF: Error loading PSF",), CRITICAL, f"- **PARAM.SFO file is busted!** DLC will probably not load! Replace them with working ones by installing the vanilla updates.", issue_id="param_sfo_broken"),
+    # MBox=empty
+    Rule(("MBox=empty",), CRITICAL, f"- **Weird MBox empty error!** You have run into a freak accident. Please try to replicate this ASAP and get back to us!", issue_id="mbox_empty"),
+    # Debug Console
+    Rule(("Debug Console Mode: false",), CRITICAL, f"- **Debug Console Mode is off. Why?** Use `!mem`", flag="debug_console_off", issue_id="debug_console_off"),
+    # Configuration not found
+    Rule(('Selected config: mode=custom config, path=""',), CRITICAL, f"- **Custom config not found**. Use `!rpcs3`", issue_id="custom_config_not_found"),
+    # Driver Wake-Up Delay
+    Rule(("Driver Wake-Up Delay: ",), check=_check_wakeup_delay),
+    # WCB
+    Rule(("Write Color Buffers: false",), CRITICAL, f"- **Write Color Buffers isn't on**. Use `!wcb`", issue_id="write_color_buffers_off"),
+    # Firmware missing
+    Rule(("SYS: Missing Firmware",), CRITICAL, f"- **No firmware installed**. Check the guide at `!rpcs3`", issue_id="firmware_missing"),
+    # SPU Block Size
+    Rule(("SPU Block Size: Giga",), CRITICAL, f"- **SPU Block Size is on Giga, which is very unstable!** Set it back to Auto or Mega in the GPU tab of RB3's Custom Configuration.", issue_id="spu_block_size_giga"),
+    # Network Status
+    Rule(("Network Status: Disconnected",), CRITICAL, f"- **Incorrect Network settings.** Use !netset", issue_id="network_settings"),
+    # High Memory file
+    Rule(("Regular file, “/dev_hdd0/game/BLUS30463/USRDIR/dx_high_memory.dta”",), flag="high_memory"),
+    # GPU does not feature
+    Rule(("Your GPU does not support",), WARNING, f"- RPCS3 is reporting that your GPU is missing features. This might be a nothing burger or something serious.", issue_id="gpu_missing_features"),
+    # Crash
+    Rule(("Thread terminated due to fatal error: Verification failed", "VM: Access violation reading location"), CRITICAL, f"- **Crash detected.** Tell us what you were doing before crashing.", issue_id="crash"),
+    # Bad dump
+    Rule(("r1 : 0xd00203f0 ->",), CRITICAL, f"- **You probably have a bad dump!** Get some fresh meats from `!arbys`.", issue_id="bad_dump"),
+    # Hanging
+    Rule(("Emulation has been frozen! You can either use debugger tools to inspect current emulation state or terminate it",), CRITICAL, f"- **Emulation paused!** Something probably broke while loading. Try to load the same thing again.", issue_id="emulation_frozen"),
+
+    # Pad Stuff
+    # Pad profile in use
+    Rule(("Product ID: 528",), PAD_ISSUE, f"- **Drums have the wrong Device Class**! All Rock Band Drums need need to be set to `Rock Band Pro`.", issue_id="drums_wrong_device_class"),
+    # Pad profile in use
+    Rule(("input_configs/BLUS30463/Default.yml",), PAD_ISSUE, f"- **Per-game pad profile detected**! We heavily discourage this. Check `!padprofiles`.", issue_id="per_game_pad_profile"),
+    # Mic in use
+    Rule(("cellMic: cellMicOpenEx(dev_nu",), PAD_INFO, f"- At least one microphone is set up in I/O.", issue_id="microphone_in_io"),
+    # Passthrough RB Guitar
+    Rule(("matches up with LDD <RockBandGuitar>",), PAD_INFO, f"- At least one Rock Band guitar is connected with passthrough.", issue_id="rb_guitar_passthrough"),
+    # Santroller device in use
+    Rule(("sys_usbd: Found device: Santroller",), PAD_INFO, f"- I see a Santroller device. All hail Sanjay.", issue_id="santroller_device"),
+    # I/O MIDI Keyboard in use
+    Rule(("Emulated Midi Pro Adapter (type=Keyboard",), PAD_INFO, f"- A MIDI keyboard is set up via I/O.", issue_id="midi_keyboard_in_io"),
+    # Passthrough RB Keytar
+    Rule(("matches up with LDD <RockBandKeyboard>",), PAD_INFO, f"- The game should see Rock Band Keyboard connected.", issue_id="rb_keyboard_passthrough"),
+    # I/O MIDI Drums in use
+    Rule(("Emulated Midi Pro Adapter (type=Drums",), PAD_INFO, f"- A MIDI Drum Kit is set up via I/O.", issue_id="midi_drums_in_io"),
+    # Passthrough RB drums
+    Rule(("matches up with LDD <RockBandDrums>",), PAD_INFO, f"- The game should see Rock Band drums connected.", issue_id="rb_drums_passthrough"),
+    # I/O MIDI Protar 17 in use
+    Rule(("Emulated Midi Pro Adapter (type=Guitar (17 frets)",), PAD_INFO, f"- A 17 fret Pro Guitar is set up via I/O.", issue_id="pro_guitar_17_in_io"),
+    # Passthrough RB Mustang
+    Rule(("matches up with LDD <RockBandButtonGuitar>",), PAD_INFO, f"- The game should see a Rock Band Mustang Pro Guitar connected.", issue_id="mustang_passthrough"),
+    # I/O MIDI Protar 22 in use
+    Rule(("Emulated Midi Pro Adapter (type=Guitar (22 frets)",), PAD_INFO, f"- A 22 fret Pro Guitar is set up via I/O.", issue_id="pro_guitar_22_in_io"),
+    # Passthrough RB Squier
+    Rule(("matches up with LDD <RockBandRealGuitar>",), PAD_INFO, f"- The game should see a Rock Band Squier Pro Guitar connected.", issue_id="squier_passthrough"),
+    # USB overload
+    Rule(("sys_usbd: Transfer Error",), CRITICAL, f"- **Usbd error.** This shouldn't be happening anymore! Tell us how your USB devices are connected.", issue_id="usbd_error"),
+    # Mic error
+    Rule(("Make sure microphone use is authorized under",), CRITICAL, f"- **The emulator can't use your microphone!** Does RPCS3 have permissions in Windows Settings? Is something else using it?", issue_id="microphone_blocked"),
+    # MIDI error
+    Rule(("log: Could not open port",), CRITICAL, f"- **Can't hook into MIDI device!** Close out any other programs using MIDI or restart computer.", issue_id="midi_port_error"),
+
+    #Network stuff
+    Rule(("User is already logged in",), CRITICAL, f"- **Zombie RPCN login!** You lost connection to RPCN and it did not log out correctly. Wait around 20 minutes before trying again. If you're using a VPN, try without.", issue_id="zombie_rpcn_login"),
+    Rule(("UPNP Enabled: true",), flag="upnp_enabled"),
+    Rule(("No UPNP device was found",), flag="upnp_error"),
+)
+
+# Lines every healthy core section contains; each missing one is reported
+# with its message once the scan is done, in this order.
+EXPECTED_LINES = (
+    # GoCentral address detection
+    ("IP swap list: rb3ps3live.hmxservices.com=45.33.44.103", "not_on_gocentral", WARNING, f"- **You're not on GoCentral :(.** Why not join the fun? The guide at `!rpcn` can walk you through this."),
+    # Non-default settings detection
+    ("PPU Decoder: Recompiler (LLVM)", "ppu_decoder", NON_DEFAULT, f"- **CPU tab:** Set `PPU Decoder` back to `Recompiler (LLVM)`."),
+    ("SPU Decoder: Recompiler (LLVM)", "spu_decoder", NON_DEFAULT, f"- **CPU tab:** Set `SPU Decoder` back to `Recompiler (LLVM)`."),
+    ("Max CPU Preempt Count: 0", "max_cpu_preempt_count", NON_DEFAULT, f"- **CPU tab:** Set `Max Power Saving CPU-preemptions` back to `0`."),
+    ("XFloat Accuracy: Approximate", "xfloat_accuracy", NON_DEFAULT, f"- **CPU tab:** Set `SPU XFloat Accuracy` back to `Approximate XFloat`."),
+    ("Shader Mode: Async Shader Recompiler", "shader_mode", NON_DEFAULT, f"- **GPU tab:** Set `Shader Mode` back to `Async (multi threaded)`."),
+    ("Strict Rendering Mode: false", "strict_rendering_mode", NON_DEFAULT, f"- **GPU tab:** Disable `Strict Rendering Mode` under the `Additional Settings` section."),
+    ("Shader Compiler Threads: 0", "shader_compiler_threads", NON_DEFAULT, f"- **GPU tab:** Set `Number of Shader Compiler Threads` back to `Auto`."),
+    ("Asynchronous Texture Streaming 2: false", "async_texture_streaming", NON_DEFAULT, f"- **GPU tab:** You have enabled `Asynchronous Texture Streaming` under the `Additional Settings`. Only do this if you have a newer GPU and MTRSX enabled for your CPU."),
+    ("Bind address: 0.0.0.0", "bind_address", NON_DEFAULT, f"- **Network tab:** Unless you have a good reason, `Bind address` should be set to `0.0.0.0`"),
+    ("DNS address: 8.8.8.8", "dns_address", NON_DEFAULT, f"- **Network tab:** Unless you have a good reason, `DNS` should be set to `8.8.8.8`"),
+    ("Accurate SPU DMA: false", "accurate_spu_dma", NON_DEFAULT, f"- **Advanced tab:** Disable `Accurate SPU DMA` under the `Core` section."),
+    ("Accurate RSX reservation access: false", "accurate_rsx_reservation_access", NON_DEFAULT, f"- **Advanced tab:** Disable `Accurate RSX reservation access` under the `Core` section."),
+    ("SPU Profiler: false", "spu_profiler", NON_DEFAULT, f"- **Advanced tab:** Disable `SPU Profiler` under the `Core` section."),
+    ("PPU Fixup Vector NaN Values: false", "ppu_fixup_vector_nan", NON_DEFAULT, f"- **Advanced tab:** Disable `PPU Fixup Vector NaN Values` under the `Core` section."),
+    ("Clocks scale: 100", "clocks_scale", NON_DEFAULT, f"- **Advanced tab:** Set `Clocks scale` back to `100%`."),
+    ("Write Depth Buffer: false", "write_depth_buffer", NON_DEFAULT, f"- **Advanced tab:** Disable `Write Depth Buffer` under the `GPU` section."),
+    ("Read Color Buffers: false", "read_color_buffers", NON_DEFAULT, f"- **Advanced tab:** Disable `Read Color Buffers DMA` under the `GPU` section."),
+    ("Read Depth Buffer: false", "read_depth_buffer", NON_DEFAULT, f"- **Advanced tab:** Disable `Read Depth Buffer` under the `GPU` section."),
+    ("Handle RSX Memory Tiling: false", "rsx_memory_tiling", NON_DEFAULT, f"- **Advanced tab:** Disable `Handle RSX Memory Tiling` under the `GPU` section."),
+    ("Disable Vertex Cache: false", "disable_vertex_cache", NON_DEFAULT, f"- **Advanced tab:** Disable `Disable Vertex Cache` under the `GPU` section."),
+    ("Disable On-Disk Shader Cache: false", "disable_shader_cache", NON_DEFAULT, f"- **Advanced tab:** Disable `Disable On-Disk Shader Cache` under the `GPU` section."),
+    ("Force Hardware MSAA Resolve: false", "force_msaa_resolve", NON_DEFAULT, f"- **Advanced tab:** Disable `Force Hardware MSAA Resolve` under the `GPU` section."),
+    ("Allow Host GPU Labels: false", "host_gpu_labels", NON_DEFAULT, f"- **Advanced tab:** Disable `Allow Host GPU Labels (Experimental)` under the `GPU` section."),
+    ("Start Paused: false", "start_paused", NON_DEFAULT, f"- **Emulator tab:** Disable `Pause emulation after loading savestates` under the `Emulator Settings` section."),
+    ("Pause emulation on RPCS3 focus loss: false", "pause_on_focus_loss", NON_DEFAULT, f"- **Emulator tab:** You enabled `Pause emulation on RPCS3 focus loss` under the `Emulator Settings` section. This makes your emulator pause whenever you click out of it. Are you sure about this?"),
+    ("Pause Emulation During Home Menu: false", "pause_in_home_menu", NON_DEFAULT, f"- **Emulator tab:** You enabled `Pause emulation during home menu` under the `Emulator Settings` section. This makes your emulator pause whenever you bring up the home menu. Are you sure about this?"),
+    ("IP address: 0.0.0.0", "ip_address", NON_DEFAULT, f"- You have somehow changed the `IP address` in the config file. Unless you have a good reason, set it back to `0.0.0.0`"),
+    ("MFC Commands Shuffling Limit: 0", "mfc_shuffling_limit", NON_DEFAULT, f"- You changed `MFC Commands Shuffling Limit` in the config file for RB3. Why? Set it back."),
+)
+
+# Issues raised when every flag in the tuple was set somewhere in the core section
+COMBINED_RULES = (
+    (("high_memory", "debug_console_off"), "high_memory_without_debug_console", CRITICAL, f"- **dx_high_memory is installed but Debug Console is off! YOUR GAME WILL CRASH!**"),
+    (("upnp_enabled", "upnp_error"), "upnp_error", CRITICAL, f"- **UPNP error detected! You will probably crash while online!**"),
+    (("vsync_off", "above60_vblank"), "vsync_meta", WARNING, f"- **It could be better!** You may get a smoother experience with the new VSync meta. Use `!vsyncmeta` for more information."),
+)
+
+# Header facts: each is looked for until its first hit, after which its
+# pattern is dropped from the per-line scan
+TITLE_LINE = "SYS: Title: Rock Band 3"
+SERIAL_LINE = "SYS: Serial: BLUS30463"
+GPU_LINE = "CFG: Setting the default renderer to Vulkan. Default GPU:"
+FIRMWARE_LINE = "SYS: Firmware version: "
+SPANISH_LINE = "Language: Spanish"
+LOCAL_BUILD_LINE = "this is a local build"
+CUSTOM_CONFIG_LINE = "Applying custom config"
+HEADER_LINES = (TITLE_LINE, SERIAL_LINE, GPU_LINE, FIRMWARE_LINE, SPANISH_LINE, LOCAL_BUILD_LINE, CUSTOM_CONFIG_LINE)
+
+# Starts a new core section; the last one in the log is the one reported on
+USED_CONFIG_LINE = "Used configuration"
+
+class LiteralMatcher:
+    """
+    Finds which of a fixed set of literals occur in a line. The literals are
+    folded into a single trie-shaped regex, so lines that contain none of them
+    (nearly all of a big log) are rejected by one C-level scan.
+    """
+
+    def __init__(self, literals):
+        self.literals = sorted(set(literals))
+        trie = {}
+        for literal in self.literals:
+            node = trie
+            for char in literal:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        pattern = self._trie_pattern(trie)
+        self._search = re.compile(pattern).search
+        # Zero-width scan so overlapping literals are all reported
+        self._finditer = re.compile(f"(?=({pattern}))").finditer
+        # The trie matches the longest literal at each position; the shorter
+        # ones contained in it are recovered from here
+        self.implied = {
+            literal: tuple(other for other in self.literals if other in literal)
+            for literal in self.literals
+        }
+
+    @classmethod
+    def _trie_pattern(cls, node):
+        branches = [re.escape(char) + cls._trie_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1:
+            pattern = branches[0]
+            return f"(?:{pattern})?" if "" in node else pattern
+        pattern = "(?:" + "|".join(branches) + ")"
+        return pattern + "?" if "" in node else pattern
+
+    def find(self, line):
+        match = self._search(line)
+        if match is None:
+            return set()
+        found = set()
+        for match in self._finditer(line, match.start()):
+            found.update(self.implied[match.group(1)])
+        return found
+
+# Every literal the analyzer cares about, mapped to the core rules it triggers
+_CORE_RULES_BY_LITERAL = defaultdict(list)
+for _index, _rule in enumerate(CORE_RULES):
+    for _literal in _rule.literals:
+        _CORE_RULES_BY_LITERAL[_literal].append(_index)
+_EXPECTED_LITERALS = frozenset(literal for literal, _, _, _ in EXPECTED_LINES)
+_HEADER_LITERALS = frozenset(HEADER_LINES)
+_CORE_MATCHER = LiteralMatcher([*_CORE_RULES_BY_LITERAL, *_EXPECTED_LITERALS, USED_CONFIG_LINE])
+# Used until every header fact has been found
+_MATCHER = LiteralMatcher([*_CORE_MATCHER.literals, *_HEADER_LITERALS])
+
+# Longest thread context / call stack block kept for the debug report
+MAX_BLOCK_LINES = 2000
+
+# How much of a log (decompressed) probe_log_header reads; RPCS3 prints the
+# game title and serial as soon as it boots, well inside this
+HEADER_PROBE_BYTES = 1024 * 1024
+
+NOT_RB3_LOG_MESSAGE = "**I don't understand this!** Boot the game first to generate a log."
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# How often (in lines) analyze_log reports progress; a few MB of a typical log
+PROGRESS_EVERY_LINES = 64 * 1024
+
+def open_log_binary(log_source):
+    """
+    Open a log for streaming binary reads. `log_source` is either the path of
+    a `.log` / `.log.gz` file or the raw bytes of an upload; gzip is
+    decompressed on the fly either way.
+    """
+    if isinstance(log_source, (bytes, bytearray)):
+        buffer = io.BytesIO(log_source)
+        if log_source[:2] == GZIP_MAGIC:
+            return gzip.GzipFile(fileobj=buffer)
+        return buffer
+    if log_source.endswith(".gz"):
+        return gzip.open(log_source, "rb")
+    return open(log_source, "rb")
+
+def open_log(log_source, encoding):
+    """Open a log (see open_log_binary) for streaming text reads."""
+    return io.TextIOWrapper(open_log_binary(log_source), encoding=encoding)
+
+def log_source_size(log_source):
+    """Size of a log as stored (compressed for .gz), the total progress is measured against."""
+    if isinstance(log_source, (bytes, bytearray)):
+        return len(log_source)
+    return os.path.getsize(log_source)
+
+def source_position(file):
+    """How far into the stored (possibly compressed) log a file from open_log has read."""
+    binary = file.buffer
+    # GzipFile reports decompressed offsets; the file under it is what counts
+    return getattr(binary, "fileobj", binary).tell()
+
+def normalize_lines(file):
+    """Yield the lines of `file` with smart quotes replaced by plain ones."""
+    for line in file:
+        yield (line.replace("“", '"')
+                   .replace("”", '"')
+                   .replace("‘", "'")
+                   .replace("’", "'"))
+
+def probe_log_header(log_source, max_bytes=HEADER_PROBE_BYTES):
+    """
+    Cheap check that a log (path or bytes) comes from a Rock Band 3 boot,
+    looking only at its first `max_bytes`.
+    """
+    with open_log_binary(log_source) as file:
+        head = file.read(max_bytes)
+    return TITLE_LINE.encode() in head and SERIAL_LINE.encode() in head
+
+class LogScanner:
+    """
+    Single pass over a log, keeping only what the summary needs: whole-file
+    facts, the state of the current core section and the two bounded debug
+    blocks. Memory use does not depend on the size of the log.
+    """
+
+    def __init__(self):
+        self.line_count = 0
+        self.head = []  # first three lines: version, CPU, OS
+        self.title_found = False
+        self.serial_found = False
+        self.gpu = ""
+        self.gpu_found = False
+        self.gpu_line_index = None
+        self.firmware_version = None
+        self.firmware_line_index = None
+        self.language_message = ""
+        self.local_build_detected = False
+        self.custom_config_found = False
+        self.last_core_index = -1
+        self.call_stack_block = []
+        self.thread_context = []
+
+        # Core section state, restarted at every "Used configuration" line so
+        # that only the last one survives
+        self.core_issues = None
+        self.core_flags = None
+        self.core_seen = None
+
+    def scan(self, lines, progress=None):
+        """Scan `lines`, calling progress() every PROGRESS_EVERY_LINES lines if given."""
+        pending = set(_HEADER_LITERALS)
+        core_issues = core_flags = core_seen = None
+        call_stack_block = self.call_stack_block
+        thread_context = self.thread_context
+        find = _MATCHER.find
+
+        # Call stack / thread context blocks: 0 = not started, 1 = collecting, 2 = done
+        stack_state = 0
+        context_state = 0
+        # First config dump: 0 = not reached, 1 = reading it, 2 = done
+        dump_state = 0
+
+        index = -1
+        for index, line in enumerate(lines):
+            if index < 3:
+                self.head.append(line.strip())
+            if progress is not None and index % PROGRESS_EVERY_LINES == 0:
+                progress()
+
+            if dump_state == 1 and line.startswith("·"):
+                # Regular log lines again: the language was in the dump or isn't set
+                dump_state = 2
+                pending.discard(SPANISH_LINE)
+                if not pending:
+                    find = _CORE_MATCHER.find
+
+            # Collect the entire call-stack block
+            if stack_state != 2:
+                # start when we hit the call‐stack header
+                if stack_state == 0 and line.strip().startswith("Call stack:"):
+                    stack_state = 1
+                if stack_state == 1:
+                    # stop once the regular log lines resume
+                    if line.lstrip().startswith("·"):
+                        stack_state = 2
+                    else:
+                        call_stack_block.append(line.rstrip())
+                        if len(call_stack_block) >= MAX_BLOCK_LINES:
+                            call_stack_block.append(f"[truncated after {MAX_BLOCK_LINES} lines]")
+                            stack_state = 2
+
+            # Collect thread context block
+            if context_state != 2:
+                # start when we hit the context header
+                if context_state == 0 and _THREAD_CONTEXT_RE.search(line):
+                    context_state = 1
+                if context_state == 1:
+                    # once we reach the call‐stack marker, stop collecting
+                    if line[:11].lower() == "call stack:":
+                        context_state = 2
+                    else:
+                        # otherwise grab every single line (including blanks)
+                        thread_context.append(line.rstrip())
+                        if len(thread_context) >= MAX_BLOCK_LINES:
+                            thread_context.append(f"[truncated after {MAX_BLOCK_LINES} lines]")
+                            context_state = 2
+
+            found = find(line)
+            if not found:
+                continue
+
+            header_hits = found & pending if pending else None
+            if header_hits:
+                if TITLE_LINE in header_hits:
+                    self.title_found = True
+                if SERIAL_LINE in header_hits:
+                    self.serial_found = True
+                if GPU_LINE in header_hits:
+                    # Only the first renderer line counts
+                    gpu_match = _GPU_RE.search(line)
+                    if gpu_match:
+                        self.gpu = gpu_match.group(1)
+                        self.gpu_found = True
+                    else:
+                        self.gpu_line_index = index
+                if FIRMWARE_LINE in header_hits:
+                    firmware_match = _FIRMWARE_RE.search(line)
+                    if firmware_match:
+                        self.firmware_version = firmware_match.group(1)
+                        self.firmware_line_index = index
+                    else:
+                        header_hits.discard(FIRMWARE_LINE)
+                if SPANISH_LINE in header_hits:
+                    self.language_message = "Hola. Explica lo que paso. / This user speaks Spanish."
+                if LOCAL_BUILD_LINE in header_hits:
+                    self.local_build_detected = True
+                if CUSTOM_CONFIG_LINE in header_hits:
+                    self.custom_config_found = True
+
+                pending -= header_hits
+                if not pending:
+                    # Everything from the header is known; scan for core lines only
+                    find = _CORE_MATCHER.find
+
+            if USED_CONFIG_LINE in found:
+                if dump_state == 0:
+                    dump_state = 1
+                    # RPCS3 says it's a local build at startup, before any game boots
+                    pending.discard(LOCAL_BUILD_LINE)
+                    if not pending:
+                        find = _CORE_MATCHER.find
+                self.last_core_index = index
+                core_issues = {section: defaultdict(line_numbers) for section in SECTIONS}
+                core_flags = set()
+                core_seen = set()
+
+            if core_issues is None:
+                continue
+
+            # Core section checks, in rule table order
+            line_number = index + 1
+            rule_indices = sorted({i for literal in found for i in _CORE_RULES_BY_LITERAL.get(literal, ())})
+            for rule_index in rule_indices:
+                rule = CORE_RULES[rule_index]
+                issue_id, section, message, flag = rule.issue_id, rule.section, rule.message, rule.flag
+                if rule.check:
+                    result = rule.check(line)
+                    if result is None:
+                        continue
+                    issue_id, section, message, flag = result
+                if flag:
+                    core_flags.add(flag)
+                if message:
+                    core_issues[section][issue_id, message].append(line_number)
+            core_seen |= found & _EXPECTED_LITERALS
+
+        self.line_count = index + 1
+        self.core_issues = core_issues
+        self.core_flags = core_flags
+        self.core_seen = core_seen
+
+# One entry of the summary: what was found and the line numbers it was seen on
+Issue = namedtuple("Issue", ["issue_id", "section", "message", "lines"])
+
+EMBED_TITLE = "Log Analysis Result"
+EMBED_DESCRIPTION_LIMIT = 4096
+
+class LogAnalysis:
+    """
+    Outcome of analyzing one log. Either `error` says why the log couldn't be
+    analyzed, or `issues` holds what was found, in summary order. Nothing is
+    rendered until one of the render_* methods asks for it.
+    """
+
+    def __init__(self, issues=(), emulator_info=None, language_message="", debug_text=None, error=None):
+        self.issues = tuple(issues)
+        self.emulator_info = emulator_info or {}
+        self.language_message = language_message
+        self.debug_text = debug_text  # thread context / call stack report, if any
+        self.error = error
+
+    @classmethod
+    def failed(cls, error):
+        return cls(error=error)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def section(self, section):
+        return [issue for issue in self.issues if issue.section == section]
+
+    def render_text(self):
+        """The markdown summary posted to Discord, or the error message."""
+        if not self.ok:
+            return self.error
+
+        output = ""
+        for section in SECTIONS:
+            if section == PAD_INFO and not any(issue.section != PAD_INFO for issue in self.issues):
+                output += NO_ISSUES_MESSAGE
+            issues = self.section(section)
+            if issues:
+                output += SECTION_HEADINGS[section]
+                for issue in issues:
+                    output += f"{issue.message} (on {format_line_refs(issue.lines)})\n"
+
+        # Add emulator information
+        info = self.emulator_info
+        output += f"\n\n**Version:** {info['version']}\n**CPU:** {info['cpu']}\n**GPU:** {info['gpu']}\n{info['os']}"
+
+        if self.language_message:
+            output += f"\n\n{self.language_message}"
+
+        return output
+
+    def render_embed(self):
+        """Keyword arguments for a discord.Embed showing the summary."""
+        return {"title": EMBED_TITLE, "description": self.render_text()[:EMBED_DESCRIPTION_LIMIT]}
+
+    def to_dict(self):
+        """Everything but the debug text, as plain JSON types."""
+        return {
+            "error": self.error,
+            "emulator_info": self.emulator_info,
+            "language_message": self.language_message or None,
+            "has_debug": self.debug_text is not None,
+            "issues": [{**issue._asdict(), "lines": issue.lines.tolist()} for issue in self.issues],
+        }
+
+    def render_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+class MappingProgress:
+    """
+    Progress callback for analyze_log that stores (bytes_done, bytes_total)
+    under `key` in `mapping`. Picklable, so with a multiprocessing manager
+    dict it reports back from a worker process.
+    """
+
+    def __init__(self, mapping, key):
+        self.mapping = mapping
+        self.key = key
+
+    def __call__(self, done, total):
+        self.mapping[self.key] = (done, total)
+
+class AnalysisTimeout(TimeoutError):
+    """analyze_log ran longer than its `timeout`."""
+
+def analyze_log(log_source, progress=None, timeout=None):
+    """
+    Analyze a log without writing anything to disk. `log_source` is a
+    `.log` / `.log.gz` path or the raw bytes of an uploaded log. Always
+    returns a LogAnalysis; unreadable or non-RB3 logs come back with `error`
+    set. `progress(bytes_done, bytes_total)` is called now and then while the
+    log is read, with sizes as stored (compressed for .gz). Past `timeout`
+    seconds from the call, AnalysisTimeout is raised at the next of those points.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+
+    # Bail out on anything that isn't an RB3 log before reading all of it
+    if not probe_log_header(log_source):
+        return LogAnalysis.failed(NOT_RB3_LOG_MESSAGE)
+
+    # Attempt to stream the log file with different encodings
     encodings = ['utf-8', 'latin-1', 'cp1252']  # Add more encodings if needed
-    lines = []
+
+    total = log_source_size(log_source) if progress else 0
 
     for encoding in encodings:
+        scanner = LogScanner()
         try:
-            with open(log_file_path, 'r', encoding=encoding) as file:
-                # Read and normalize all lines in one go
-                lines = [line.replace("“", '"')
-                             .replace("”", '"')
-                             .replace("‘", "'")
-                             .replace("’", "'") for line in file.readlines()]
-                
-                # Collect the entire call-stack block
-                call_stack_block = []
-                in_stack = False
-                for line in lines:
-                    # start when we hit the call‐stack header
-                    if line.strip().startswith("Call stack:"):
-                        in_stack = True
-                    if in_stack:
-                        # stop only when we hit a truly empty line *after* we've started collecting
-                        if line.lstrip().startswith("·"):
-                           break
-                        call_stack_block.append(line.rstrip())
-
-                # Collect thread context block
-                in_context = False
-                for line in lines:
-                    low = line.lower()
-                    # start when we hit the context header
-                    if "thread context:" in low:
-                        in_context = True
-            
-                    if in_context:
-                        # once we reach the call‐stack marker, stop collecting
-                        if low.startswith("call stack:"):
-                            break
-                        # otherwise grab every single line (including blanks)
-                        thread_context.append(line.rstrip())
+            with open_log(log_source, encoding) as file:
+                def report():
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise AnalysisTimeout(f"log analysis took longer than {timeout} seconds")
+                    if progress:
+                        progress(source_position(file), total)
+                scanner.scan(normalize_lines(file), report if progress or deadline is not None else None)
             break  # Exit loop if successful
         except UnicodeDecodeError:
-            continue  # Try next encoding
+            continue  # Start over with the next encoding
     else:
-        return "**Error**: Unable to read the log file with the provided encodings."
+        return LogAnalysis.failed("**Error**: Unable to read the log file with the provided encodings.")
+
+    if progress:
+        progress(total, total)
 
     # Check if this is a Rock Band 3 log
-    if not any("SYS: Title: Rock Band 3" in line for line in lines) or \
-       not any("SYS: Serial: BLUS30463" in line for line in lines):
-        return "**I don't understand this!** Boot the game first to generate a log."
+    if not scanner.title_found or not scanner.serial_found:
+        return LogAnalysis.failed(NOT_RB3_LOG_MESSAGE)
 
     # Extract emulator information
-    emulator_info["version"] = lines[0].strip() if lines else ""
-    emulator_info["cpu"] = lines[1].strip() if len(lines) > 1 else ""
-    emulator_info["os"] = lines[2].strip() if len(lines) > 2 else ""
+    head = scanner.head + [""] * (3 - len(scanner.head))
+    emulator_info = {"version": head[0], "cpu": head[1], "os": head[2], "gpu": scanner.gpu}
+
+    # (issue_id, message) -> line numbers, per section, in the order found
+    sections = {section: defaultdict(line_numbers) for section in SECTIONS}
+    critical_issues = sections[CRITICAL]
 
     # Detect emulator version number and flag if in the range 16920-17034
-    version_match = re.search(r"RPCS3 v0\.0\.\d+-(\d+)-[a-f0-9]+", emulator_info["version"])
+    version_match = _VERSION_RE.search(emulator_info["version"])
     if version_match:
         version_number = int(version_match.group(1))
         if 16920 <= version_number <= 17034:
-            critical_issues["- **The version you're on is prone to crashing!** Update your RPCS3 as soon as possible!"] \
-                .append("L-1")  # Assuming the version is always on the first line
-
-    # Check for GPU information
-    gpu_found = False
-    for i, line in enumerate(lines):
-        if "CFG: Setting the default renderer to Vulkan. Default GPU:" in line:
-            gpu_match = re.search(r"Default GPU: '(.*)'", line)
-            if gpu_match:
-                emulator_info["gpu"] = gpu_match.group(1)
-                gpu_found = True
-            break  # Stop searching once found
-    
-    if not gpu_found:
-        critical_issues[f"- **Vulkan compatible GPU not found!** We can't really help you with this one."].append(f"L-{i}")
-
-    # Check log for firmware version and language, with firmware first
-    for line in lines:
-        firmware_match = re.search(r"SYS: Firmware version: (\d+\.\d+)", line)
-        if firmware_match:
-            firmware_version = firmware_match.group(1)
-            firmware_detected = True
-            if float(firmware_version) < 4.88:
-                game_issues[f"- **Outdated firmware.** You are on `{firmware_version}`. **Please update to the latest PS3 firmware!**"].append(f"L-{lines.index(line) + 1}")
-
-        # Check for language setting
-        if "Language: Spanish" in line:
-            language_message = "Hola. Explica lo que paso. / This user speaks Spanish."
-
-        if "this is a local build" in line:
-            local_build_detected = True
-
-    # Scan the log file for "Used configuration" and track indices
-    for i, line in enumerate(lines):
-        if "Applying custom config" in line:
-            custom_config_found = True
-        if "Used configuration" in line:
-            last_core_index = i
-    if not custom_config_found:
-        critical_issues[f"- **You have no custom configuration set!** Please follow the guide at `!rpcs3`."].append(f"L-{i}")
-    
+            critical_issues["crash_prone_version", "- **The version you're on is prone to crashing!** Update your RPCS3 as soon as possible!"] \
+                .append(1)  # Assuming the version is always on the first line
+
+    last_index = scanner.line_count - 1
+    if not scanner.gpu_found:
+        gpu_index = scanner.gpu_line_index if scanner.gpu_line_index is not None else last_index
+        critical_issues["vulkan_gpu_not_found", f"- **Vulkan compatible GPU not found!** We can't really help you with this one."].append(gpu_index)
+
+    firmware_version = scanner.firmware_version
+    if firmware_version and float(firmware_version) < 4.88:
+        sections[WARNING]["outdated_firmware", f"- **Outdated firmware.** You are on `{firmware_version}`. **Please update to the latest PS3 firmware!**"].append(scanner.firmware_line_index + 1)
+
+    if not scanner.custom_config_found:
+        critical_issues["no_custom_config", f"- **You have no custom configuration set!** Please follow the guide at `!rpcs3`."].append(last_index)
+
     # Process log information if custom config was found
-    if custom_config_found and last_core_index != -1:
-        core_section_lines = lines[last_core_index:]
-
-        high_memory_detected = False
-        debug_console_mode_off = False
-        enable_upnp = False
-        upnp_error_detected = False
-        ipadd_found = False
-        bindadd_found = False
-        dns_found = False
-        gocentral_found = False
-        vsyncoff_found = False
-        above60_vblank_found = False
-        # Non-default stuff
-        ppudef_found = False
-        spudef_found = False
-        shaderdef_found = False
-        spudmadef_found = False
-        rsxresdef_found = False
-        spuprofdef_found = False
-        mfcdef_found = False
-        xfloatdef_found = False
-        ppufixdef_found = False
-        clocksdef_found = False
-        maxcpudef_found = False
-        rsxtiledef_found = False
-        strictrenderdef_found = False
-        disvercachedef_found = False
-        disdiskshaderdef_found = False
-        msaaresolvedef_found = False
-        shaderthreadsdef_found = False
-        gpulabelsdef_found = False
-        asynchtexdef_found = False
-        startpausedef_found = False
-        pausefocusdef_found = False
-        pausehomedef_found = False
-        wrdbufdef_found = False
-        rcbufdef_found = False
-        rdbufdef_found = False
-
-        # Check for specific conditions in the extracted section
-        for i, line in enumerate(core_section_lines, start=last_core_index + 1):
-            # Check for high memory
-            if 'CELL_ENOENT, "/dev_hdd0/game/BLUS30463/USRDIR/dx_high_memory.dta"' in line:
-                critical_issues[f"- **High memory file is missing!** Check out `!mem` for more information."].append(f"L-{i}")
-
-            #Frame limit
-            if "Frame limit: Infinite" in line or "Frame limit: 50" in line or "Frame limit: 30" in line or "Frame limit: PS3 Native" in line:
-                critical_issues[f"- **You are using an unsupported Framelimit value!** Set this back to 60, Display, or Off."].append(f"L-{i}")
-
-            # OpenGL Detect
-            if "Renderer: OpenGL" in line:
-                game_issues[f"- **You're using OpenGL!** You should really be on Vulkan. Set this in the GPU tab of RB3's Custom Configuration."].append(f"L-{i}")
-
-            # Presence Crash Detect
-            if "{\\qPlaylist\\q:\\q,\\qSubPlaylist\\" in line:
-                critical_issues[f"- **Error writing to Presence file!** You'll need to delete all files called `currentsong.json` in RB3's USRDIR folder. `!gamedata`"].append(f"L-{i}")
-
-            # 1920x1080 Detect
-            if "Resolution: 1920x1080" in line:
-                critical_issues[f"- **Forcing Rock Band to run at 1920x1080 will cause crashes!** You should really set this back to 1280x720 in the GPU section of RB3's custom configuration."].append(f"L-{i}")
-
-            # OneDrive install detection
-            if "OneDrive" in line:
-                if "OneDrive install detected" not in onedrive_install:
-                    onedrive_install.add("- **OneDrive detected! This can lead to corrupted files and saves!** Please move files to `C:\\Games`**")
-                    critical_issues[f"- **OneDrive detected! This can lead to corrupted files and saves!** Please move files to `C:\\Games`"].append(f"L-{i}")
-
-            # Program Files install detection
-            if "Program Files" in line:
-                if "Program Files install detected" not in programfiles_install:
-                    programfiles_install.add("- **Program Files install detected! This can lead to issues due to permissions!** Please move files to `C:\\Games`**")
-                    critical_issues[f"- **Program Files install detected! This can lead to issues due to permissions!** Please move files to `C:\\Games`"].append(f"L-{i}")
-
-            # Busted save
-            if "dev_hdd0/home/00000001/savedata/BLUS30463-AUTOSAVE/ (Already exists)" in line:
-                if "Busted save detected" not in save_issues:
-                    save_issues.add("- **Busted save detected!** Move the `BLUS30463-AUTOSAVE`folder out of savedata folder in `dev_hdd0`.")
-                    critical_issues[f"- **Busted save detected!** Move the `BLUS30463-AUTOSAVE` folder out of `dev_hdd0\\home\\00000001\\savedata`."].append(f"L-{i}")
-
-            # Vblank Rate
-            if re.search(r"Vblank Rate: (\d+)", line):
-                vblank_frequency  = int(re.search(r"\d+", line).group())
-                if vblank_frequency < 60:
-                    critical_issues[f"- **VBlank should not be below 60**. Set it back to 60 in the Advanced tab of RB3's Custom Configuration."].append(f"L-{i}")
-                elif vblank_frequency > 60:
-                    above60_vblank_found = True
-                    game_issues[f"- Playing on a VBlank higher than 60 is not suggested. Use `!vsyncmeta` for more information."].append(f"L-{i}")
-
-            # VSync False
-            if "VSync: false" in line:
-                vsyncoff_found = True
-            
-            # OpenGL
-            if "Renderer: OpenGL" in line:
-                game_issues[f"- **You're using OpenGL!** You should really be on Vulkan. Set this in the GPU tab of RB3's Custom Configuration."].append(f"L-{i}")
-
-            # High Audio Buffer Duration
-            match = re.search(r"Desired Audio Buffer Duration: (\d+)", line)
-            if match:
-                buffer_duration = int(match.group(1))
-                if buffer_duration >= 100:
-                    game_issues[f"- **Audio Buffer is quite high.** Consider lowering it to 32 in the Audio tab of RB3's Custom Configuration. It's set to {buffer_duration} ms"].append(f"L-{i}")
-
-            # Audio Broken
-            if "cellAudio: Failed to open audio backend" in line or "Thread terminated due to fatal error: Unsupported layout" in line:
-                critical_issues[f"- **Audio device doesn't work!** Check to make you selected the proper audio device in the Audio tab of RB3's Custom Configuration."].append(f"L-{i}")
-
-            # Fullscreen settings
-            if "Exclusive Fullscreen Mode: Enable" in line or "Exclusive Fullscreen Mode: Automatic" in line:
-                game_issues[f"- Depending on your graphics driver, **you may experience issues with the Automatic or Exclusive Fullscreen settings** when clicking in and out of RPCS3. Consider setting it to `Prefer Borderless Fullscreen` in the Advanced tab of RB3's Custom Configuration."].append(f"L-{i}")
-
-            # Shader Compilation Broke
-            if "Shader does not write to any output register and will be NOPed" in line:
-                critical_issues[f"- **Shader compilation failed!** Clear the cache and update RPCS3 if you haven't. Use `!caches` for more information."].append(f"L-{i}")
-
-            # Vulkan Device Lost
-            if "Driver crashed with unspecified error or stopped responding and recovered" in line:
-                critical_issues[f"- **Display error!** Check your graphics card drivers. Use `!vkdiag` for more information."].append(f"L-{i}")
-
-            # PSF Broken
-            if "PSF: Error loading PSF" in line:
-                critical_issues[f"- **PARAM.SFO file is busted!** DLC will probably not load! Replace them with working ones by installing the vanilla updates."].append(f"L-{i}")
-            # MBox=empty
-            if "MBox=empty" in line:
-                critical_issues[f"- **Weird MBox empty error!** You have run into a freak accident. Please try to replicate this ASAP and get back to us!"].append(f"L-{i}")
-            # Debug Console
-            if "Debug Console Mode: false" in line:
-                debug_console_mode_off = True
-                critical_issues[f"- **Debug Console Mode is off. Why?** Use `!mem`"].append(f"L-{i}")
-            # Configuration not found
-            if 'Selected config: mode=custom config, path=""' in line:
-                critical_issues[f"- **Custom config not found**. Use `!rpcs3`"].append(f"L-{i}")
-            # Driver Wake-Up Delay
-            if re.search(r"Driver Wake-Up Delay: (\d+)", line):
-                delay_value = int(re.search(r"\d+", line).group())
-                if delay_value < 20:
-                    critical_issues[f"- **Driver Wake-Up Delay is too low.** Yours is set to ({delay_value}). Use `!dwd`"].append(f"L-{i}")
-                elif delay_value % 20 != 0:
-                    game_issues[f"- **Driver Delay Wake-Up Settings isn't a multiple of 20**. Yours is at (value: {delay_value}). Use `!dwd`"].append(f"L-{i}")
-            # WCB
-            if "Write Color Buffers: false" in line:
-                critical_issues[f"- **Write Color Buffers isn't on**. Use `!wcb`"].append(f"L-{i}")
-            # Firmware missing
-            if "SYS: Missing Firmware" in line:
-                critical_issues[f"- **No firmware installed**. Check the guide at `!rpcs3`"].append(f"L-{i}")
-            # SPU Block Size
-            if "SPU Block Size: Giga" in line:
-                critical_issues[f"- **SPU Block Size is on Giga, which is very unstable!** Set it back to Auto or Mega in the GPU tab of RB3's Custom Configuration."].append(f"L-{i}")
-            # Network Status
-            if "Network Status: Disconnected" in line:
-                critical_issues[f"- **Incorrect Network settings.** Use !netset"].append(f"L-{i}")
-            # High Memory file
-            if "Regular file, “/dev_hdd0/game/BLUS30463/USRDIR/dx_high_memory.dta”" in line:
-                high_memory_detected = True
-            # GPU does not feature
-            if "Your GPU does not support" in line:
-                game_issues[f"- RPCS3 is reporting that your GPU is missing features. This might be a nothing burger or something serious."].append(f"L-{i}")
-            # Crash
-            if any(error in line for error in ["Thread terminated due to fatal error: Verification failed", "VM: Access violation reading location"]):
-                critical_issues[f"- **Crash detected.** Tell us what you were doing before crashing."].append(f"L-{i}")
-            # Bad dump
-            if "r1 : 0xd00203f0 ->" in line:
-                critical_issues[f"- **You probably have a bad dump!** Get some fresh meats from `!arbys`."].append(f"L-{i}")
-            # Hanging
-            if "Emulation has been frozen! You can either use debugger tools to inspect current emulation state or terminate it" in line:
-                critical_issues[f"- **Emulation paused!** Something probably broke while loading. Try to load the same thing again."].append(f"L-{i}")
-            
-            # Pad Stuff
-            # Pad profile in use
-            if 'Product ID: 528' in line:
-                pad_issues[f"- **Drums have the wrong Device Class**! All Rock Band Drums need need to be set to `Rock Band Pro`."].append(f"L-{i}")
-            # Pad profile in use
-            if 'input_configs/BLUS30463/Default.yml' in line:
-                pad_issues[f"- **Per-game pad profile detected**! We heavily discourage this. Check `!padprofiles`."].append(f"L-{i}")
-            # Mic in use
-            if 'cellMic: cellMicOpenEx(dev_nu' in line:
-                pad_info[f"- At least one microphone is set up in I/O."].append(f"L-{i}")
-            # Passthrough RB Guitar
-            if 'matches up with LDD <RockBandGuitar>' in line:
-                pad_info[f"- At least one Rock Band guitar is connected with passthrough."].append(f"L-{i}")
-            # Santroller device in use
-            if 'sys_usbd: Found device: Santroller' in line:
-                pad_info[f"- I see a Santroller device. All hail Sanjay."].append(f"L-{i}")
-            # I/O MIDI Keyboard in use
-            if 'Emulated Midi Pro Adapter (type=Keyboard' in line:
-                pad_info[f"- A MIDI keyboard is set up via I/O."].append(f"L-{i}")
-            # Passthrough RB Keytar
-            if 'matches up with LDD <RockBandKeyboard>' in line:
-                pad_info[f"- The game should see Rock Band Keyboard connected."].append(f"L-{i}")
-            # I/O MIDI Drums in use
-            if 'Emulated Midi Pro Adapter (type=Drums' in line:
-                pad_info[f"- A MIDI Drum Kit is set up via I/O."].append(f"L-{i}")
-            # Passthrough RB drums
-            if 'matches up with LDD <RockBandDrums>' in line:
-                pad_info[f"- The game should see Rock Band drums connected."].append(f"L-{i}")
-            # I/O MIDI Protar 17 in use
-            if 'Emulated Midi Pro Adapter (type=Guitar (17 frets)' in line:
-                pad_info[f"- A 17 fret Pro Guitar is set up via I/O."].append(f"L-{i}")
-            # Passthrough RB Mustang
-            if 'matches up with LDD <RockBandButtonGuitar>' in line:
-                pad_info[f"- The game should see a Rock Band Mustang Pro Guitar connected."].append(f"L-{i}")
-            # I/O MIDI Protar 22 in use
-            if 'Emulated Midi Pro Adapter (type=Guitar (22 frets)' in line:
-                pad_info[f"- A 22 fret Pro Guitar is set up via I/O."].append(f"L-{i}")
-            # Passthrough RB Squier
-            if 'matches up with LDD <RockBandRealGuitar>' in line:
-                pad_info[f"- The game should see a Rock Band Squier Pro Guitar connected."].append(f"L-{i}")
-            # USB overload
-            if "sys_usbd: Transfer Error" in line:
-                critical_issues[f"- **Usbd error.** This shouldn't be happening anymore! Tell us how your USB devices are connected."].append(f"L-{i}")
-            # Mic error
-            if 'Make sure microphone use is authorized under' in line:
-                critical_issues[f"- **The emulator can't use your microphone!** Does RPCS3 have permissions in Windows Settings? Is something else using it?"].append(f"L-{i}")
-            # MIDI error
-            if "log: Could not open port" in line:
-                critical_issues[f"- **Can't hook into MIDI device!** Close out any other programs using MIDI or restart computer."].append(f"L-{i}")
-            
-            #Network stuff
-            if "User is already logged in" in line:
-                critical_issues[f"- **Zombie RPCN login!** You lost connection to RPCN and it did not log out correctly. Wait around 20 minutes before trying again. If you're using a VPN, try without."].append(f"L-{i}")
-            if "UPNP Enabled: true" in line:
-                enable_upnp = True
-            if "No UPNP device was found" in line:
-                upnp_error_detected = True
-            # IP address detection
-            if "IP address: 0.0.0.0" in line:
-                ipadd_found = True
-            # Bind address detection
-            if "Bind address: 0.0.0.0" in line:
-                bindadd_found = True
-            # DNS address detection
-            if "DNS address: 8.8.8.8" in line:
-                dns_found = True
-            # GoCentral address detection
-            if "IP swap list: rb3ps3live.hmxservices.com=45.33.44.103" in line:
-                gocentral_found = True
-            # Non-default settings detection
-            if "PPU Decoder: Recompiler (LLVM)" in line:
-                ppudef_found = True
-            if "SPU Decoder: Recompiler (LLVM)" in line:
-                spudef_found = True
-            if "Shader Mode: Async Shader Recompiler" in line:
-                shaderdef_found = True
-            if "Accurate SPU DMA: false" in line:
-                spudmadef_found = True
-            if "Accurate RSX reservation access: false" in line:
-                rsxresdef_found = True
-            if "SPU Profiler: false" in line:
-                spuprofdef_found = True
-            if "MFC Commands Shuffling Limit: 0" in line:
-                mfcdef_found = True
-            if "XFloat Accuracy: Approximate" in line:
-                xfloatdef_found = True
-            if "PPU Fixup Vector NaN Values: false" in line:
-                ppufixdef_found = True
-            if "Clocks scale: 100" in line:
-                clocksdef_found = True
-            if "Max CPU Preempt Count: 0" in line:
-                maxcpudef_found = True
-            if "Handle RSX Memory Tiling: false" in line:
-                rsxtiledef_found = True
-            if "Strict Rendering Mode: false" in line:
-                strictrenderdef_found = True
-            if "Disable Vertex Cache: false" in line:
-                disvercachedef_found = True
-            if "Disable On-Disk Shader Cache: false" in line:
-                disdiskshaderdef_found = True
-            if "Write Depth Buffer: false" in line:
-                wrdbufdef_found = True
-            if "Read Color Buffers: false" in line:
-                rcbufdef_found = True
-            if "Read Depth Buffer: false" in line:
-                rdbufdef_found = True
-            if "Force Hardware MSAA Resolve: false" in line:
-                msaaresolvedef_found = True
-            if "Shader Compiler Threads: 0" in line:
-                shaderthreadsdef_found = True
-            if "Allow Host GPU Labels: false" in line:
-                gpulabelsdef_found = True
-            if "Asynchronous Texture Streaming 2: false" in line:
-                asynchtexdef_found = True
-            if "Start Paused: false" in line:
-                startpausedef_found = True
-            if "Pause emulation on RPCS3 focus loss: false" in line:
-                pausefocusdef_found = True
-            if "Pause Emulation During Home Menu: false" in line:
-                pausehomedef_found = True
-
-        if not gocentral_found:
-            game_issues[f"- **You're not on GoCentral :(.** Why not join the fun? The guide at `!rpcn` can walk you through this."].append(f"L-{i}")
-
-        # Non-default settings log
-        if not ppudef_found:
-            non_default_settings[f"- **CPU tab:** Set `PPU Decoder` back to `Recompiler (LLVM)`."].append(f"L-{i}")
-        if not spudef_found:
-            non_default_settings[f"- **CPU tab:** Set `SPU Decoder` back to `Recompiler (LLVM)`."].append(f"L-{i}")
-        if not maxcpudef_found:
-            non_default_settings[f"- **CPU tab:** Set `Max Power Saving CPU-preemptions` back to `0`."].append(f"L-{i}")
-        if not xfloatdef_found:
-            non_default_settings[f"- **CPU tab:** Set `SPU XFloat Accuracy` back to `Approximate XFloat`."].append(f"L-{i}")
-        if not shaderdef_found:
-            non_default_settings[f"- **GPU tab:** Set `Shader Mode` back to `Async (multi threaded)`."].append(f"L-{i}")
-        if not strictrenderdef_found:
-            non_default_settings[f"- **GPU tab:** Disable `Strict Rendering Mode` under the `Additional Settings` section."].append(f"L-{i}")
-        if not shaderthreadsdef_found:
-            non_default_settings[f"- **GPU tab:** Set `Number of Shader Compiler Threads` back to `Auto`."].append(f"L-{i}")
-        if not asynchtexdef_found:
-            non_default_settings[f"- **GPU tab:** You have enabled `Asynchronous Texture Streaming` under the `Additional Settings`. Only do this if you have a newer GPU and MTRSX enabled for your CPU."].append(f"L-{i}")
-        if not bindadd_found:
-            non_default_settings[f"- **Network tab:** Unless you have a good reason, `Bind address` should be set to `0.0.0.0`"].append(f"L-{i}")
-        if not dns_found:
-            non_default_settings[f"- **Network tab:** Unless you have a good reason, `DNS` should be set to `8.8.8.8`"].append(f"L-{i}")
-        if not spudmadef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Accurate SPU DMA` under the `Core` section."].append(f"L-{i}")
-        if not rsxresdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Accurate RSX reservation access` under the `Core` section."].append(f"L-{i}")
-        if not spuprofdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `SPU Profiler` under the `Core` section."].append(f"L-{i}")
-        if not ppufixdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `PPU Fixup Vector NaN Values` under the `Core` section."].append(f"L-{i}")
-        if not clocksdef_found:
-            non_default_settings[f"- **Advanced tab:** Set `Clocks scale` back to `100%`."].append(f"L-{i}")
-        if not wrdbufdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Write Depth Buffer` under the `GPU` section."].append(f"L-{i}")
-        if not rcbufdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Read Color Buffers DMA` under the `GPU` section."].append(f"L-{i}")
-        if not rdbufdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Read Depth Buffer` under the `GPU` section."].append(f"L-{i}")
-        if not rsxtiledef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Handle RSX Memory Tiling` under the `GPU` section."].append(f"L-{i}")
-        if not disvercachedef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Disable Vertex Cache` under the `GPU` section."].append(f"L-{i}")
-        if not disdiskshaderdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Disable On-Disk Shader Cache` under the `GPU` section."].append(f"L-{i}")
-        if not msaaresolvedef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Force Hardware MSAA Resolve` under the `GPU` section."].append(f"L-{i}")
-        if not gpulabelsdef_found:
-            non_default_settings[f"- **Advanced tab:** Disable `Allow Host GPU Labels (Experimental)` under the `GPU` section."].append(f"L-{i}")
-        if not startpausedef_found:
-            non_default_settings[f"- **Emulator tab:** Disable `Pause emulation after loading savestates` under the `Emulator Settings` section."].append(f"L-{i}")
-        if not pausefocusdef_found:
-            non_default_settings[f"- **Emulator tab:** You enabled `Pause emulation on RPCS3 focus loss` under the `Emulator Settings` section. This makes your emulator pause whenever you click out of it. Are you sure about this?"].append(f"L-{i}")
-        if not pausehomedef_found:
-            non_default_settings[f"- **Emulator tab:** You enabled `Pause emulation during home menu` under the `Emulator Settings` section. This makes your emulator pause whenever you bring up the home menu. Are you sure about this?"].append(f"L-{i}")
-        if not ipadd_found:
-            non_default_settings[f"- You have somehow changed the `IP address` in the config file. Unless you have a good reason, set it back to `0.0.0.0`"].append(f"L-{i}")
-        if not mfcdef_found:
-            non_default_settings[f"- You changed `MFC Commands Shuffling Limit` in the config file for RB3. Why? Set it back."].append(f"L-{i}")
+    if scanner.custom_config_found and scanner.last_core_index != -1:
+        for section, issues in scanner.core_issues.items():
+            for key, lines in issues.items():
+                sections[section][key].extend(lines)
+
+        # Everything found missing is reported against the last line
+        end_line = scanner.line_count
+        for literal, issue_id, section, message in EXPECTED_LINES:
+            if literal not in scanner.core_seen:
+                sections[section][issue_id, message].append(end_line)
 
         # Additional Stuff
 
-        if local_build_detected:
-            critical_issues[f"- **This is not an official RPCS3 build!** Please [[download a proper version of RPCS3]](https://rpcs3.net/download)."].append(f"L-{i}")
+        if scanner.local_build_detected:
+            critical_issues["unofficial_build", f"- **This is not an official RPCS3 build!** Please [[download a proper version of RPCS3]](https://rpcs3.net/download)."].append(end_line)
 
         # Check for combined issues
-        if high_memory_detected and debug_console_mode_off:
-            critical_issues[f"- **dx_high_memory is installed but Debug Console is off! YOUR GAME WILL CRASH!**"].append(f"L-{i}")
-
-        if enable_upnp and upnp_error_detected:
-            critical_issues[f"- **UPNP error detected! You will probably crash while online!**"].append(f"L-{i}")
-
-        if vsyncoff_found and above60_vblank_found:
-            game_issues[f"- **It could be better!** You may get a smoother experience with the new VSync meta. Use `!vsyncmeta` for more information."].append(f"L-{i}")
-
-    # Preparing the output
-    output = ""
-
-    if critical_issues:
-        output += "## Critical :exclamation:\n_Guaranteed to be a problem!_\n"
-        for issue, lines in critical_issues.items():
-            line_info = ", ".join(lines)  # Combine all line numbers
-            output += f"{issue} (on {line_info})\n"
-
-    if game_issues:
-        output += "\n## Warning :warning:\n_May or may not cause issues._\n"
-        for issue, lines in game_issues.items():
-            line_info = ", ".join(lines)  # Combine all line numbers
-            output += f"{issue} (on {line_info})\n"
-
-    if non_default_settings:
-        output += "\n## Non-default settings :question:\n_Set these in Rock Band 3's Custom Configuration. Use `!global` for more information._\n"
-        for issue, lines in non_default_settings.items():
-            line_info = ", ".join(lines)  # Combine all line numbers
-            output += f"{issue} (on {line_info})\n"
-
-    if pad_issues:
-        output += "\n## Input Errors :guitar:\n_Here's some problems with your controllers._\n"
-        for issue, lines in pad_issues.items():
-            line_info = ", ".join(lines)  # Combine all line numbers
-            output += f"{issue} (on {line_info})\n"
+        for flags, issue_id, section, message in COMBINED_RULES:
+            if scanner.core_flags.issuperset(flags):
+                sections[section][issue_id, message].append(end_line)
+
+    issues = [
+        Issue(issue_id, section, message, lines)
+        for section in SECTIONS
+        for (issue_id, message), lines in sections[section].items()
+    ]
 
     details = []
-    if thread_context:
+    if scanner.thread_context:
         details.append("=== THREAD CONTEXT ===")
-        details.extend(thread_context)
+        details.extend(scanner.thread_context)
         details.append("")  # blank line
-    if call_stack_block:
+    if scanner.call_stack_block:
         details.append("=== CALL STACK + DISASSEMBLY ===")
-        details.extend(call_stack_block)
+        details.extend(scanner.call_stack_block)
+    debug_text = "\n".join(details) if details else None
 
+    return LogAnalysis(issues, emulator_info, scanner.language_message, debug_text)
+
+def analyze_log_file(log_file_path):
+    """
+    Like analyze_log, but writes the debug text next to the log. Returns
+    (analysis, path of the debug file or None).
+    """
+    analysis = analyze_log(log_file_path)
     diagnostics_file = None
-    if details:
-        diagnostics_file = log_file_path + ".debug.txt"
+    if analysis.debug_text is not None:
+        diagnostics_file = log_file_path.removesuffix(".gz") + ".debug.txt"
         with open(diagnostics_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(details))
-    
-    if not critical_issues and not game_issues and not non_default_settings and not pad_issues:
-        output += "## No issues detected. Either nothing is wrong or I don't know how to detect your issue yet."
-    
-    if pad_info:
-        output += "\n## Input Info :guitar:\n_Here's some pad and I/O information._\n"
-        for issue, lines in pad_info.items():
-            line_info = ", ".join(lines)  # Combine all line numbers
-            output += f"{issue} (on {line_info})\n"
-
-    # Add emulator information
-    output += f"\n\n**Version:** {emulator_info['version']}\n**CPU:** {emulator_info['cpu']}\n**GPU:** {emulator_info['gpu']}\n{emulator_info['os']}"
-
-    if language_message:
-        output += f"\n\n{language_message}"
-
-    return output, diagnostics_file
\ No newline at end of file
+            f.write(analysis.debug_text)
+    return analysis, diagnostics_file
+
+def hash_log_file(log_source, chunk_size=1024 * 1024):
+    """
+    SHA-256 of the decompressed contents of a log (path or bytes), so `.log`
+    and `.log.gz` uploads of the same log match.
+    """
+    digest = hashlib.sha256()
+    with open_log_binary(log_source) as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_and_analyze_log(log_source, known_digests=frozenset(), timeout=None, **kwargs):
+    """
+    hash_log_file and analyze_log in one call, so a worker process can do
+    both. Returns (digest, analysis); the analysis is skipped, and None, when
+    the digest is in `known_digests`. Hashing counts towards `timeout`.
+    """
+    start = time.monotonic()
+    digest = hash_log_file(log_source)
+    if digest in known_digests:
+        return digest, None
+    if timeout:
+        timeout = max(timeout - (time.monotonic() - start), 0.001)
+    return digest, analyze_log(log_source, timeout=timeout, **kwargs)
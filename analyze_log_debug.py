@@ -1,22 +1,300 @@
+"""
+Run logs through analyze_log by hand.
+
+    py analyze_log_debug.py log_file_path
+        Analyze one log and print the result.
+
+    py analyze_log_debug.py check corpus_dir [--goldens dir] [--update]
+        Analyze every .log / .log.gz in corpus_dir and diff the summary and
+        debug output against the stored goldens. --update rewrites them.
+
+    py analyze_log_debug.py compare corpus_dir --old analyze_log_old.py|git-rev
+        Run an older analyzer (a file, or analyze_log.py at a git revision)
+        side by side with the current one, reporting output diffs and the
+        speedup per file.
+
+    py analyze_log_debug.py batch path_or_glob... [--report report.jsonl] [--workers N]
+        Analyze every log under the given files, directories and globs on all
+        cores, write one JSON line per log and print how often each issue
+        came up.
+"""
+import argparse
+import difflib
+import glob
+import gzip
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
 import sys
-from analyze_log import analyze_log_file
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from analyze_log import analyze_log, analyze_log_file
+
+SUMMARY_SUFFIX = ".summary.txt"
+DEBUG_SUFFIX = ".debug.txt"
 
 def main(log_file_path):
     # Confirm the file path
     print(f"Log file path: {log_file_path}")
-    
+
     try:
         # Call the analyze_log_file function from analyze_log module
-        output = analyze_log_file(log_file_path)
+        analysis, diagnostics_file = analyze_log_file(log_file_path)
         # Print the output result
-        print(f"Analyze log output: {output}")
+        print(f"Analyze log output: {analysis.render_text()}")
+        if diagnostics_file:
+            print(f"Debug info written to {diagnostics_file}")
     except Exception as e:
         print(f"Error while analyzing log file: {e}")
 
+def find_logs(corpus_dir):
+    logs = glob.glob(os.path.join(corpus_dir, "*.log")) + glob.glob(os.path.join(corpus_dir, "*.log.gz"))
+    return sorted(logs)
+
+def log_name(path):
+    return os.path.basename(path).removesuffix(".gz").removesuffix(".log")
+
+def analyze_for_golden(path):
+    """Summary and debug text as they would be stored, "" for a missing debug report."""
+    analysis = analyze_log(path)
+    return analysis.render_text(), analysis.debug_text or ""
+
+def read_text(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+def write_text(path, text):
+    with open(path, "w", encoding="utf-8", newline="\n") as file:
+        file.write(text)
+
+def print_diff(expected, actual, label):
+    diff = difflib.unified_diff(expected.splitlines(), actual.splitlines(),
+                                f"{label} (golden)", f"{label} (current)", lineterm="")
+    for line in diff:
+        print(f"    {line}")
+
+def check_goldens(corpus_dir, goldens_dir, update):
+    """Returns the number of logs whose output no longer matches its goldens."""
+    logs = find_logs(corpus_dir)
+    if not logs:
+        print(f"No logs found in {corpus_dir}")
+        return 0
+
+    os.makedirs(goldens_dir, exist_ok=True)
+    failures = 0
+    for path in logs:
+        name = log_name(path)
+        summary, debug_text = analyze_for_golden(path)
+        outputs = ((SUMMARY_SUFFIX, summary), (DEBUG_SUFFIX, debug_text))
+
+        if update:
+            for suffix, text in outputs:
+                write_text(os.path.join(goldens_dir, name + suffix), text)
+            print(f"UPDATED {name}")
+            continue
+
+        mismatched = False
+        for suffix, text in outputs:
+            golden_path = os.path.join(goldens_dir, name + suffix)
+            expected = read_text(golden_path)
+            if expected is None:
+                print(f"MISSING {golden_path} (run with --update to create it)")
+                mismatched = True
+            elif expected != text:
+                print(f"DIFF    {name}{suffix}")
+                print_diff(expected, text, name + suffix)
+                mismatched = True
+        if mismatched:
+            failures += 1
+        else:
+            print(f"OK      {name}")
+
+    if not update:
+        print(f"{len(logs) - failures}/{len(logs)} logs match their goldens")
+    return failures
+
+def load_analyzer(path, module_name):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_old_analyzer(old, work_dir):
+    """--old is either a path to an analyzer module or a git revision of analyze_log.py."""
+    if os.path.isfile(old):
+        return load_analyzer(old, "analyze_log_old")
+
+    source = subprocess.run(["git", "show", f"{old}:analyze_log.py"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, check=True).stdout
+    path = os.path.join(work_dir, "analyze_log_old.py")
+    with open(path, "wb") as file:
+        file.write(source)
+    return load_analyzer(path, "analyze_log_old")
+
+def run_analyzer(module, path):
+    """
+    analyze_log_file is the one entry point every revision has. Returns
+    (summary, debug text, seconds); the debug file it leaves behind is removed.
+    Older revisions return the summary as a string, or just an error string.
+    """
+    start = time.perf_counter()
+    result = module.analyze_log_file(path)
+    elapsed = time.perf_counter() - start
+
+    if isinstance(result, str):
+        return result, "", elapsed
+    summary, debug_path = result
+    if not isinstance(summary, str):
+        summary = summary.render_text()
+    debug_text = ""
+    if debug_path and os.path.exists(debug_path):
+        debug_text = read_text(debug_path)
+        os.remove(debug_path)
+    return summary, debug_text, elapsed
+
+def stage_log(path, work_dir):
+    # Older analyzers only read plain text logs, so both sides get a decompressed copy
+    staged = os.path.join(work_dir, log_name(path) + ".log")
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as source, open(staged, "wb") as target:
+        shutil.copyfileobj(source, target)
+    return staged
+
+def compare_implementations(corpus_dir, old):
+    """Returns the number of logs where the old and current analyzers disagree."""
+    logs = find_logs(corpus_dir)
+    if not logs:
+        print(f"No logs found in {corpus_dir}")
+        return 0
+
+    current = sys.modules["analyze_log"]
+    differences = 0
+    total_old = total_new = 0.0
+    with tempfile.TemporaryDirectory() as work_dir:
+        old_module = load_old_analyzer(old, work_dir)
+        print(f"{'log':<40} {'old s':>9} {'new s':>9} {'speedup':>8}  result")
+        for path in logs:
+            staged = stage_log(path, work_dir)
+            old_summary, old_debug, old_time = run_analyzer(old_module, staged)
+            new_summary, new_debug, new_time = run_analyzer(current, staged)
+            os.remove(staged)
+            total_old += old_time
+            total_new += new_time
+
+            same = old_summary == new_summary and old_debug == new_debug
+            speedup = old_time / new_time if new_time else float("inf")
+            name = log_name(path)
+            print(f"{name:<40} {old_time:9.3f} {new_time:9.3f} {speedup:7.2f}x  {'same' if same else 'DIFF'}")
+            if not same:
+                differences += 1
+                if old_summary != new_summary:
+                    print_diff(old_summary, new_summary, name + SUMMARY_SUFFIX)
+                if old_debug != new_debug:
+                    print_diff(old_debug, new_debug, name + DEBUG_SUFFIX)
+
+    overall = total_old / total_new if total_new else float("inf")
+    print(f"{len(logs)} logs, {differences} with differences, overall speedup {overall:.2f}x")
+    return differences
+
+def expand_inputs(inputs):
+    """Files, directories (searched recursively) and globs to a sorted list of logs."""
+    logs = set()
+    for item in inputs:
+        paths = glob.glob(item, recursive=True) if glob.has_magic(item) else [item]
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    logs.update(os.path.join(root, name) for name in files
+                                if name.endswith((".log", ".log.gz")))
+            elif os.path.isfile(path):
+                logs.add(path)
+    return sorted(logs)
+
+def batch_analyze_one(path):
+    """Runs in a pool worker; returns the report entry for one log."""
+    start = time.perf_counter()
+    try:
+        analysis = analyze_log(path)
+    except Exception as e:
+        return {"log": path, "error": f"{type(e).__name__}: {e}", "issues": []}
+    return {"log": path, **analysis.to_dict(), "seconds": round(time.perf_counter() - start, 4)}
+
+def batch_analyze(inputs, report_path, workers):
+    """Returns the number of logs that could not be analyzed."""
+    logs = expand_inputs(inputs)
+    if not logs:
+        print("No logs found")
+        return 0
+
+    counts = Counter()
+    errors = 0
+    report = open(report_path, "w", encoding="utf-8") if report_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for entry in pool.map(batch_analyze_one, logs, chunksize=4):
+                if report:
+                    report.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                if entry["error"]:
+                    errors += 1
+                    print(f"ERROR {entry['log']}: {entry['error'].splitlines()[0]}")
+                # Count each issue once per log, however many lines it was on
+                counts.update({(issue["section"], issue["issue_id"]) for issue in entry["issues"]})
+    finally:
+        if report:
+            report.close()
+
+    print(f"{len(logs)} logs analyzed, {errors} could not be analyzed")
+    for (section, issue_id), count in counts.most_common():
+        print(f"{count:6}  [{section}] {issue_id}")
+    if report_path:
+        print(f"Per-log report written to {report_path}")
+    return errors
+
+def corpus_main(argv):
+    parser = argparse.ArgumentParser(prog="analyze_log_debug.py", description="Regression checks for analyze_log.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser("check", help="diff analyzer output against stored goldens")
+    check.add_argument("corpus_dir")
+    check.add_argument("--goldens", help="golden output directory (default: corpus_dir/golden)")
+    check.add_argument("--update", action="store_true", help="rewrite the goldens from the current analyzer")
+
+    compare = commands.add_parser("compare", help="run an older analyzer side by side with the current one")
+    compare.add_argument("corpus_dir")
+    compare.add_argument("--old", required=True, help="path to an older analyze_log.py, or a git revision")
+
+    batch = commands.add_parser("batch", help="analyze many logs in parallel and count the issues found")
+    batch.add_argument("inputs", nargs="+", help="log files, directories or globs (.log and .log.gz)")
+    batch.add_argument("--report", help="write one JSON line per log to this file")
+    batch.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        failures = batch_analyze(args.inputs, args.report, args.workers)
+    elif args.command == "check":
+        goldens_dir = args.goldens or os.path.join(args.corpus_dir, "golden")
+        failures = check_goldens(args.corpus_dir, goldens_dir, args.update)
+    else:
+        failures = compare_implementations(args.corpus_dir, args.old)
+    sys.exit(1 if failures else 0)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("check", "compare", "batch"):
+        corpus_main(sys.argv[1:])
     # Check if the correct number of arguments is provided
-    if len(sys.argv) != 2:
+    elif len(sys.argv) != 2:
         print("Usage: py.py log_file_path")
+        print("       py.py check corpus_dir [--goldens dir] [--update]")
+        print("       py.py compare corpus_dir --old analyze_log_old.py|git-rev")
+        print("       py.py batch path_or_glob... [--report report.jsonl] [--workers N]")
     else:
         log_file_path = sys.argv[1]
         main(log_file_path)
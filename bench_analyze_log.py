@@ -0,0 +1,139 @@
+"""
+Throughput benchmark for analyze_log.
+
+Generates synthetic logs (see synthetic_log.py), analyzes each one in a
+fresh process and reports MB/s and peak RSS. Results can be written to a
+JSON baseline and later runs compared against it, exiting non-zero when
+the analyzer got slower or hungrier than allowed.
+
+    python bench_analyze_log.py --sizes 1MB,10MB,100MB --output baseline.json
+    python bench_analyze_log.py --sizes 1MB,10MB,100MB --baseline baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from synthetic_log import generate_log, parse_size
+
+DEFAULT_SIZES = "1MB,10MB,100MB"
+DEFAULT_CORPUS_DIR = os.path.join("out", "bench")
+
+def _analyze_in_child(path):
+    """Runs inside the spawned worker: analyze once, report time and peak RSS."""
+    from analyze_log import analyze_log
+
+    start = time.perf_counter()
+    result = analyze_log(path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024
+    return elapsed, max_rss, result.ok
+
+def run_once(path):
+    # A new interpreter per run so peak RSS isn't inherited from earlier, bigger logs
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_analyze_in_child, path).result()
+
+def corpus_path(corpus_dir, size_bytes, compress, seed):
+    suffix = ".log.gz" if compress else ".log"
+    return os.path.join(corpus_dir, f"synthetic_{size_bytes}_{seed}{suffix}")
+
+def ensure_log(corpus_dir, size_bytes, compress, seed):
+    """Generate the synthetic log unless an earlier run already left it behind."""
+    path = corpus_path(corpus_dir, size_bytes, compress, seed)
+    if not os.path.exists(path):
+        os.makedirs(corpus_dir, exist_ok=True)
+        print(f"Generating {path}...")
+        generate_log(path, size_bytes, seed=seed, compress=compress)
+    return path
+
+def bench_size(label, size_bytes, args):
+    path = ensure_log(args.corpus_dir, size_bytes, args.gzip, args.seed)
+    timings = []
+    peak_rss = 0
+    for _ in range(args.repeat):
+        elapsed, max_rss, ok = run_once(path)
+        if not ok:
+            raise RuntimeError(f"{path} was not recognized as an RB3 log")
+        timings.append(elapsed)
+        peak_rss = max(peak_rss, max_rss)
+
+    # Best of N is the least noisy number on a shared machine
+    best = min(timings)
+    mb = size_bytes / (1024 * 1024)
+    return {
+        "size": label,
+        "bytes": size_bytes,
+        "gzip": args.gzip,
+        "seconds": [round(t, 4) for t in timings],
+        "best_seconds": round(best, 4),
+        "mb_per_s": round(mb / best, 2),
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Returns a list of human readable regressions, empty if all is well."""
+    previous = {(entry["size"], entry["gzip"]): entry for entry in baseline.get("results", [])}
+    problems = []
+    for entry in results:
+        old = previous.get((entry["size"], entry["gzip"]))
+        if old is None:
+            continue
+        if entry["mb_per_s"] < old["mb_per_s"] * (1 - max_regression):
+            problems.append(f"{entry['size']}: throughput {entry['mb_per_s']} MB/s, baseline {old['mb_per_s']} MB/s")
+        if entry["peak_rss_mb"] > old["peak_rss_mb"] * (1 + max_regression):
+            problems.append(f"{entry['size']}: peak RSS {entry['peak_rss_mb']} MB, baseline {old['peak_rss_mb']} MB")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze_log on synthetic RPCS3 logs.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma separated log sizes, 1MB to 1GB (default {DEFAULT_SIZES})")
+    parser.add_argument("--gzip", action="store_true", help="benchmark gzipped logs instead of plain ones")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size, best one counts (default 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR, help=f"where generated logs are kept between runs (default {DEFAULT_CORPUS_DIR})")
+    parser.add_argument("--output", help="write results as JSON, e.g. to record a new baseline")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="allowed slowdown / RSS growth vs baseline (default 0.15)")
+    args = parser.parse_args()
+
+    results = []
+    for label in args.sizes.split(","):
+        label = label.strip()
+        entry = bench_size(label, parse_size(label), args)
+        results.append(entry)
+        print(f"{label:>8}  {entry['best_seconds']:8.3f} s  {entry['mb_per_s']:8.2f} MB/s  {entry['peak_rss_mb']:7.1f} MB peak RSS")
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        problems = compare_to_baseline(results, baseline, args.max_regression)
+        if problems:
+            print("Regressions against baseline:")
+            for problem in problems:
+                print(f"- {problem}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
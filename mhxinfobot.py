@@ -1,17 +1,23 @@
+import aiohttp
 import discord
+import hashlib
+import io
 import json
 import os
 import math
+import multiprocessing
+import re
 import tempfile
-from analyze_log import analyze_log_file
-import gzip
-import shutil
+import urllib.parse
+from analyze_log import AnalysisTimeout, analyze_log, hash_and_analyze_log, hash_log_file, probe_log_header, LiteralMatcher, MappingProgress, NOT_RB3_LOG_MESSAGE
 import urllib.request as urlreq
 import uuid
-import requests
 from discord.ext import tasks
-from collections import defaultdict, deque, Counter
+from collections import defaultdict, deque, namedtuple, Counter, OrderedDict
 import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 
 # Load the config file
@@ -87,21 +93,41 @@ SCAM_PITCH_KEYWORDS = [
 def is_restricted_guild(message: discord.Message) -> bool:
     return bool(message.guild and message.guild.id in RESTRICTED_GUILDS)
 
+# --- HTTP ---
+# One pooled session for every outbound call (decomp progress, GitHub), so
+# connections are kept alive and nothing blocks the event loop
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+HTTP_MAX_CONNECTIONS = config.get("http_max_connections", 32)
+HTTP_MAX_CONNECTIONS_PER_HOST = config.get("http_max_connections_per_host", 8)
+HTTP_USER_AGENT = "mhxinfobot/1.0 (+https://github.com/hmxmilohax/mhxinfobot)"
+
+_http_session = None
+
+def http_session() -> aiohttp.ClientSession:
+    """The shared session, created on first use inside the running loop."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(limit=HTTP_MAX_CONNECTIONS, limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+                                         ttl_dns_cache=300)
+        _http_session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT,
+                                              headers={"User-Agent": HTTP_USER_AGENT})
+    return _http_session
+
+async def close_http_session():
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+
 DECOMP_URL = "https://progress.decomp.club/data/rb3/SZBE69_B8/dol/?format=json"
 
-def _fetch_decomp_json() -> dict:
-    # Use requests (you already import it), add headers so you don't look like a bot scraper.
-    headers = {
-        "User-Agent": "mhxinfobot/1.0 (+https://github.com/hmxmilohax/mhxinfobot)",
-        "Accept": "application/json",
-    }
-    r = requests.get(DECOMP_URL, headers=headers, timeout=15)
-    r.raise_for_status()
-    return r.json()
+async def _fetch_decomp_json() -> dict:
+    # The session's User-Agent keeps us from looking like a bot scraper
+    async with http_session().get(DECOMP_URL, headers={"Accept": "application/json"}) as r:
+        r.raise_for_status()
+        return await r.json()
 
-def get_decomp_info() -> str:
+async def get_decomp_info() -> str:
     try:
-        frogress_json = _fetch_decomp_json()
+        frogress_json = await _fetch_decomp_json()
 
         # remove wrapper sludge
         frogress_data = frogress_json["rb3"]["SZBE69_B8"]["dol"][0]
@@ -131,6 +157,136 @@ def get_decomp_info() -> str:
 
 GITHUB_TOKEN = config.get('github_token')
 HEADERS = {'Authorization': f'token {GITHUB_TOKEN}', 'Accept': 'application/vnd.github.v3+json'}
+# GitHub requests in flight at once; a longer rate limit wait than the
+# maximum fails the request instead of stalling the caller
+GITHUB_MAX_CONCURRENT_REQUESTS = config.get("github_max_concurrent_requests", 8)
+GITHUB_MAX_RATE_LIMIT_WAIT_SECONDS = config.get("github_max_rate_limit_wait_seconds", 60)
+
+# Responses are kept with their ETag / Last-Modified so repeat requests can be
+# conditional; a 304 answer doesn't count against the rate limit
+GITHUB_CACHE_PATH = config.get("github_cache_path", "github_cache.json")
+GITHUB_CACHE_MAX_ENTRIES = config.get("github_cache_max_entries", 2000)
+GITHUB_CACHE_SAVE_DELAY_SECONDS = 5
+
+class GitHubResponseCache:
+    """
+    Last 200 response per GitHub URL with its validators, oldest used first
+    out past max_entries. Saved to GITHUB_CACHE_PATH a few seconds after a
+    change, so a burst of requests means one write.
+    """
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)  # key -> {"etag", "last_modified", "data", "next"}
+        except (OSError, ValueError):
+            entries = {}
+        self._entries = OrderedDict(entries)
+        self._save_task = None
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, etag, last_modified, data, next_url):
+        self._entries[key] = {"etag": etag, "last_modified": last_modified, "data": data, "next": next_url}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(GITHUB_CACHE_SAVE_DELAY_SECONDS)
+        await self.save()
+
+    async def save(self):
+        data = json.dumps(self._entries)
+        await asyncio.to_thread(_write_file_atomically, self.path, data)
+
+def _github_cache_key(url, params):
+    if not params:
+        return str(url)
+    return f"{url}?{urllib.parse.urlencode(sorted(params.items()))}"
+
+_github_response_cache = GitHubResponseCache(GITHUB_CACHE_PATH, GITHUB_CACHE_MAX_ENTRIES)
+_github_semaphore = asyncio.Semaphore(GITHUB_MAX_CONCURRENT_REQUESTS)
+_github_resume_at = 0.0  # time.time() before which no GitHub request is sent
+
+def _github_rate_limit_wait(response):
+    """Seconds GitHub asks us to hold off after this response, or None."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = response.headers.get("X-RateLimit-Reset", "")
+        if reset.isdigit():
+            return max(0, int(reset) - time.time())
+    return None
+
+async def github_get(url, params=None):
+    """
+    GET a GitHub API URL through the shared session. Returns (status, JSON)
+    with the JSON None unless the status is 200; an unchanged response
+    (304 to our conditional request) comes back as the cached 200. Once
+    GitHub reports the rate limit exhausted, every request waits until it
+    resets; a rate limited request is retried once after waiting.
+    """
+    status, data, _ = await _github_fetch(url, params)
+    return status, data
+
+async def github_get_all(url, params=None):
+    """Every item of a paginated GitHub list as (status, items), following the Link headers."""
+    items = []
+    while url:
+        status, page, url = await _github_fetch(url, params)
+        if status != 200:
+            return status, None
+        items.extend(page)
+        params = None  # The next link already carries them
+    return 200, items
+
+async def _github_fetch(url, params):
+    # (status, JSON or None, URL of the next page or None)
+    global _github_resume_at
+    key = _github_cache_key(url, params)
+    cached = _github_response_cache.get(key)
+    headers = dict(HEADERS)
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    elif cached and cached["last_modified"]:
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    async with _github_semaphore:
+        for attempt in range(2):
+            wait = _github_resume_at - time.time()
+            if wait > GITHUB_MAX_RATE_LIMIT_WAIT_SECONDS:
+                print(f"GitHub rate limit: skipping {url}, resets in {wait:.0f}s")
+                return 429, None, None
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            async with http_session().get(url, headers=headers, params=params) as r:
+                limit_wait = _github_rate_limit_wait(r)
+                if limit_wait is not None:
+                    _github_resume_at = max(_github_resume_at, time.time() + limit_wait)
+                    if r.status in (403, 429) and attempt == 0:
+                        continue
+                if r.status == 304 and cached:
+                    return 200, cached["data"], cached["next"]
+                if r.status != 200:
+                    return r.status, None, None
+                next_link = r.links.get("next")
+                next_url = str(next_link["url"]) if next_link else None
+                data = await r.json()
+                if "ETag" in r.headers or "Last-Modified" in r.headers:
+                    _github_response_cache.put(key, r.headers.get("ETag"), r.headers.get("Last-Modified"), data, next_url)
+                return r.status, data, next_url
+
 UPSTREAM_REPO = config.get("upstream_repo", "hmxmilohax/mhxinfobot")
 UPSTREAM_BRANCH = config.get("upstream_branch", "main")
 EXTRA_REPOS = config.get("extra_repos", [])
@@ -145,210 +301,537 @@ intents = discord.Intents.default()
 intents.message_content = True
 client = discord.Client(intents=intents)
 
-# Load triggers from the JSON files once at startup
-with open('triggers.json') as triggers_file:
-    triggers = json.load(triggers_file)
-
-with open('triggers_esl.json') as triggers_esl_file:
-    triggers_esl = json.load(triggers_esl_file)
-
-# Build mapping from triggers to responses
-triggers_map = {}
-for response in triggers.values():
-    for trigger in response['triggers']:
-        triggers_map[trigger.lower()] = response
-
-# Build mapping from ESL triggers to responses
-triggers_esl_map = {}
-esl_triggers_with_exclamation_map = {}
-for response in triggers_esl.values():
-    for trigger in response['triggers']:
-        if trigger.startswith('!'):
-            # Remove '!' from the trigger
-            esl_triggers_with_exclamation_map[trigger[1:].lower()] = response
-        else:
-            triggers_esl_map[trigger.lower()] = response
-
-    # For linked triggers, map the linked English trigger to this response
-    if 'link' in response:
-        linked_response_number = response['link']
-        if linked_response_number in triggers:
-            linked_response = triggers[linked_response_number]
-            for trigger in linked_response['triggers']:
-                triggers_esl_map[trigger.lower()] = response
+TRIGGERS_PATH = 'triggers.json'
+TRIGGERS_ESL_PATH = 'triggers_esl.json'
+# How often the trigger files are checked for changes (0 = only on !reload)
+TRIGGER_RELOAD_SECONDS = config.get("trigger_reload_seconds", 10)
+
+# The first word starting with ! or ¡ is the command; messages without one are
+# turned away by this single scan
+COMMAND_RE = re.compile(r"(?<!\S)([!¡])(\S*)")
+
+# --- Reply planning ---
+# Discord's per-message limits
+MESSAGE_CHAR_LIMIT = 2000
+MESSAGE_FILE_LIMIT = 10
+# Total upload size per message; 10 MB is the limit in servers without boosts
+MAX_UPLOAD_BYTES_PER_MESSAGE = config.get("max_upload_bytes_per_message", 10 * 1024 * 1024)
+
+# How a trigger response is sent, worked out once when the triggers load:
+# `chunks` is the text split to fit messages, `files` the (file, path, size)
+# of media that exists and `missing` the media that doesn't
+ReplyPlan = namedtuple("ReplyPlan", ["chunks", "files", "missing"])
+
+def split_message(text):
+    """Split text into message-sized chunks, at line breaks where possible."""
+    chunks = []
+    while len(text) > MESSAGE_CHAR_LIMIT:
+        split_index = text.rfind('\n', 0, MESSAGE_CHAR_LIMIT)
+        if split_index == -1:
+            split_index = MESSAGE_CHAR_LIMIT
+        chunks.append(text[:split_index])
+        text = text[split_index:].lstrip('\n')
+
+    if text:
+        chunks.append(text)
+    return chunks
+
+def plan_reply(response) -> ReplyPlan:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    files = []
+    missing = []
+    for file in response.get("files", []):
+        if not file:
+            continue  # Empty entries mean "no file"
+        file_path = os.path.join(base_dir, file)
+        if os.path.exists(file_path):
+            files.append((file, file_path, os.path.getsize(file_path)))
         else:
-            print(f"Linked response number {linked_response_number} not found in English triggers.")
+            missing.append(file)
+    return ReplyPlan(split_message(response.get("text") or ""), files, missing)
+
+# --- Trigger suggestions ---
+# Unknown commands get a "did you mean" reply with up to this many close
+# trigger names, at most once per channel per cooldown
+TRIGGER_SUGGESTION_LIMIT = 3
+TRIGGER_SUGGESTION_COOLDOWN_SECONDS = config.get("trigger_suggestion_cooldown_seconds", 10)
+
+def edit_distance(a, b):
+    """
+    Edit distance between two strings where swapping two neighbouring
+    characters counts as one typo, like an insertion, deletion or change
+    (optimal string alignment).
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        before_previous, previous = previous, current
+    return previous[-1]
+
+def _deletions(word, count):
+    """word with up to `count` characters removed, in every way."""
+    variants = {word}
+    layer = {word}
+    for _ in range(count):
+        layer = {variant[:i] + variant[i + 1:] for variant in layer for i in range(len(variant))}
+        variants |= layer
+    return variants
+
+class TriggerIndex:
+    """
+    Finds trigger names within a small edit distance of a word. Each name is
+    filed under every string left after deleting up to max_distance of its
+    characters; a name that close to the query shares one of those strings
+    with it, so a lookup only measures the distance to a few candidates
+    instead of to every trigger.
+    """
+
+    def __init__(self, words, max_distance=2):
+        self.max_distance = max_distance
+        self._variants = defaultdict(set)  # shortened string -> names it came from
+        for word in set(words):
+            for variant in _deletions(word, max_distance):
+                self._variants[variant].add(word)
+
+    def search(self, word, max_distance):
+        """(distance, name) pairs within max_distance of word, closest first."""
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in _deletions(word, max_distance):
+            candidates |= self._variants.get(variant, set())
+        found = ((edit_distance(word, candidate), candidate) for candidate in candidates)
+        return sorted(match for match in found if match[0] <= max_distance)
+
+def suggest_triggers(index, command):
+    # Short words are within a typo or two of too many triggers to be useful
+    if not 3 <= len(command) <= 40:
+        return []
+    max_distance = 1 if len(command) <= 5 else 2
+    return [word for _, word in index.search(command, max_distance)[:TRIGGER_SUGGESTION_LIMIT]]
+
+class TriggerSet:
+    """
+    Everything built from triggers.json and triggers_esl.json. A reload builds
+    a complete new set and swaps it in with one assignment, so a message being
+    dispatched never sees a half-built one. Structural errors raise
+    ValueError; things that only break one response end up in `problems`.
+    """
+
+    def __init__(self, triggers, triggers_esl, mtimes=None):
+        self.triggers = triggers
+        self.triggers_esl = triggers_esl
+        self.mtimes = mtimes
+        self.problems = []
+
+        self._validate(TRIGGERS_PATH, triggers)
+        self._validate(TRIGGERS_ESL_PATH, triggers_esl)
+
+        # Build mapping from triggers to responses
+        self.triggers_map = {}
+        for response in triggers.values():
+            for trigger in response['triggers']:
+                self.triggers_map[trigger.lower()] = response
+
+        # Build mapping from ESL triggers to responses
+        self.triggers_esl_map = {}
+        self.esl_triggers_with_exclamation_map = {}
+        for response in triggers_esl.values():
+            for trigger in response['triggers']:
+                if trigger.startswith('!'):
+                    # Remove '!' from the trigger
+                    self.esl_triggers_with_exclamation_map[trigger[1:].lower()] = response
+                else:
+                    self.triggers_esl_map[trigger.lower()] = response
+
+            # For linked triggers, map the linked English trigger to this response
+            if 'link' in response:
+                linked_response_number = response['link']
+                if linked_response_number in triggers:
+                    linked_response = triggers[linked_response_number]
+                    for trigger in linked_response['triggers']:
+                        self.triggers_esl_map[trigger.lower()] = response
+                else:
+                    self.problems.append(f"Linked response number {linked_response_number} not found in English triggers.")
+
+        # For !log without an attachment: trigger text -> position of the first
+        # response using it, so one scan of the message finds the response the
+        # old in-order substring search would have picked
+        self.trigger_responses = list(triggers.values())
+        self.trigger_positions = {}
+        for position, response in enumerate(self.trigger_responses):
+            for trigger in response['triggers']:
+                self.trigger_positions.setdefault(trigger.lower(), position)
+        self.trigger_matcher = LiteralMatcher(self.trigger_positions)
+
+        self.list_pages = build_trigger_list_pages(triggers, triggers_esl)
+
+        # Everything process_trigger / process_esl_trigger accept, for suggestions
+        self.trigger_index = TriggerIndex(list(self.triggers_map) + list(self.esl_triggers_with_exclamation_map)
+                                    + list(self.triggers_esl_map))
+        self.esl_trigger_index = TriggerIndex(self.triggers_esl_map)
+
+        # Every response's reply, split and checked once (keyed by id(response))
+        self.reply_plans = {
+            id(response): plan_reply(response)
+            for responses in (triggers, triggers_esl)
+            for response in responses.values()
+        }
+
+    def _validate(self, path, responses):
+        if not isinstance(responses, dict):
+            raise ValueError(f"{path}: expected an object of responses")
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        for number, response in responses.items():
+            if not isinstance(response, dict):
+                raise ValueError(f"{path}: {number} is not an object")
+            names = response.get('triggers')
+            if not isinstance(names, list) or not all(isinstance(name, str) and name for name in names):
+                raise ValueError(f"{path}: {number} needs a list of non-empty trigger strings")
+            if not isinstance(response.get('text', ""), str):
+                raise ValueError(f"{path}: {number} has a text that isn't a string")
+            files = response.get('files', [])
+            if not isinstance(files, list):
+                raise ValueError(f"{path}: {number} has files that aren't a list")
+            if not all(isinstance(file, str) for file in files):
+                raise ValueError(f"{path}: {number} needs its files to be path strings")
+            if 'link' in response and not isinstance(response['link'], str):
+                raise ValueError(f"{path}: {number} has a link that isn't a response name")
+            for file in files:
+                # "" is how a response says it has no file
+                if file and not os.path.exists(os.path.join(base_dir, file)):
+                    self.problems.append(f"{path}: {number} points to missing file {file}")
+
+def trigger_file_mtimes():
+    return (os.path.getmtime(TRIGGERS_PATH), os.path.getmtime(TRIGGERS_ESL_PATH))
+
+def load_trigger_set() -> TriggerSet:
+    """Read and build both trigger files; blocking, so reloads run it in a thread."""
+    mtimes = trigger_file_mtimes()
+    with open(TRIGGERS_PATH) as triggers_file:
+        triggers = json.load(triggers_file)
+    with open(TRIGGERS_ESL_PATH) as triggers_esl_file:
+        triggers_esl = json.load(triggers_esl_file)
+    return TriggerSet(triggers, triggers_esl, mtimes)
+
 
 
 TEMP_FOLDER = "out/"
 if not os.path.exists(TEMP_FOLDER):
     os.makedirs(TEMP_FOLDER)
 
-# Constants
-COLUMNS = 3  # Number of columns to display
-COLUMNS_ALIAS = 2  # Number of columns to display for aliases
-EMBED_TIMEOUT = 60  # Timeout in seconds
-
-def generate_session_hash():
-    return str(uuid.uuid4())[:8]  # Generate a short unique hash
+# --- Log analysis worker pool ---
+# Analysis runs in separate processes so big logs never block the gateway.
+LOG_ANALYSIS_WORKERS = config.get("log_analysis_workers", 2)
+# Counted from when a worker starts on the log, so time spent queued doesn't count
+LOG_ANALYSIS_TIMEOUT_SECONDS = config.get("log_analysis_timeout_seconds", 120)
+LOG_ANALYSIS_QUEUE_LIMIT = config.get("log_analysis_queue_limit", 6)  # running + waiting jobs
+# Safety net from submit to result: a full queue ahead of the job, then the job itself
+LOG_ANALYSIS_MAX_WAIT_SECONDS = config.get(
+    "log_analysis_max_wait_seconds",
+    LOG_ANALYSIS_TIMEOUT_SECONDS * (math.ceil(LOG_ANALYSIS_QUEUE_LIMIT / LOG_ANALYSIS_WORKERS) + 1),
+)
+LOG_MAX_ATTACHMENT_BYTES = config.get("log_max_attachment_bytes", 256 * 1024 * 1024)
+# Logs up to this size are analyzed straight from memory; bigger ones go through out/ (0 = always on disk)
+LOG_IN_MEMORY_MAX_BYTES = config.get("log_in_memory_max_bytes", 32 * 1024 * 1024)
+# Logs at least this big get a progress message while they're analyzed
+LOG_PROGRESS_MIN_BYTES = config.get("log_progress_min_bytes", 8 * 1024 * 1024)
+LOG_PROGRESS_EDIT_SECONDS = config.get("log_progress_edit_seconds", 3)
+
+# Workers (and the progress manager) start from a fresh process instead of a fork
+# of the bot, which would copy its event loop and threads mid-flight
+_LOG_ANALYSIS_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_log_analysis_pool = None
+_log_analysis_jobs = 0
+_log_progress_manager = None
+_log_progress = None  # session hash -> (bytes_done, bytes_total), written by the workers
+
+def _get_log_analysis_pool() -> ProcessPoolExecutor:
+    global _log_analysis_pool
+    if _log_analysis_pool is None:
+        _log_analysis_pool = ProcessPoolExecutor(max_workers=LOG_ANALYSIS_WORKERS, mp_context=_LOG_ANALYSIS_MP_CONTEXT)
+    return _log_analysis_pool
+
+def _reserve_log_analysis_slot() -> bool:
+    global _log_analysis_jobs
+    if _log_analysis_jobs >= LOG_ANALYSIS_QUEUE_LIMIT:
+        return False
+    _log_analysis_jobs += 1
+    return True
 
-class PaginatorView(discord.ui.View):
-    def __init__(self, triggers, alias_triggers_dict, user_id, show_aliases=False, title="Available Triggers"):
-        super().__init__(timeout=EMBED_TIMEOUT)
-        self.triggers = triggers
-        self.alias_triggers_dict = alias_triggers_dict
-        self.user_id = user_id
-        self.show_aliases = show_aliases
-        self.title = title
-        self.current_page = 0
-        self.items_per_page = self.calculate_items_per_page()
-        self.total_pages = self.calculate_total_pages()
-        self.add_buttons()
-
-    def calculate_items_per_page(self):
-        total_items = len(self.current_items)
-        if total_items <= 15:
-            return max(3, math.ceil(total_items / COLUMNS))
-        elif total_items <= 30:
-            return 5
-        elif total_items <= 60:
-            return 6
-        else:
-            return 9
-
-    def calculate_total_pages(self):
-        items_count = len(self.current_items)
-        return max(1, math.ceil(items_count / (self.items_per_page * (COLUMNS if not self.show_aliases else COLUMNS_ALIAS))))
-
-    @property
-    def current_items(self):
-        if self.show_aliases:
-            return [(trigger, aliases) for trigger, aliases in self.alias_triggers_dict.items() if aliases]
-        return self.triggers
-
-    def add_buttons(self):
-        self.clear_items()
-        if self.show_aliases:
-            self.add_item(ViewTriggersButton(style=discord.ButtonStyle.secondary, label='Show Triggers', user_id=self.user_id))
-        else:
-            self.add_item(ViewAliasesButton(style=discord.ButtonStyle.secondary, label='Show Aliases', user_id=self.user_id))
-        
-        if self.current_page > 0:
-            self.add_item(PreviousButton(style=discord.ButtonStyle.primary, label='Previous', user_id=self.user_id))
-        else:
-            self.add_item(PreviousButton(style=discord.ButtonStyle.secondary, label='Previous', disabled=True, user_id=self.user_id))
-        
-        if self.current_page < self.total_pages - 1 and self.has_next_page_items():
-            self.add_item(NextButton(style=discord.ButtonStyle.primary, label='Next', user_id=self.user_id))
-        else:
-            self.add_item(NextButton(style=discord.ButtonStyle.secondary, label='Next', disabled=True, user_id=self.user_id))
-
-    def update_buttons(self):
-        self.add_buttons()
-
-    def get_embed(self):
-        embed = discord.Embed(title=self.title if not self.show_aliases else f"{self.title} - Aliases", color=discord.Color.blue())
-        
-        start_idx = self.current_page * self.items_per_page * (COLUMNS if not self.show_aliases else COLUMNS_ALIAS)
-        end_idx = start_idx + self.items_per_page * (COLUMNS if not self.show_aliases else COLUMNS_ALIAS)
-        
-        if self.show_aliases:
-            items_page = self.current_items[start_idx:end_idx]
-            alias_columns = [items_page[i * self.items_per_page:(i + 1) * self.items_per_page] for i in range(COLUMNS_ALIAS)]
-            
-            for i, col in enumerate(alias_columns):
-                if col:
-                    value = "\n".join(f"**{trigger}**\n{', '.join(aliases)}" for trigger, aliases in col)
-                else:
-                    value = "\u200B"
-                embed.add_field(name="Aliases" if i == 0 else "\u200B", value=value, inline=True)
-        else:
-            items_page = self.current_items[start_idx:end_idx]
-            trigger_columns = [items_page[i * self.items_per_page:(i + 1) * self.items_per_page] for i in range(COLUMNS)]
+def _release_log_analysis_slot():
+    global _log_analysis_jobs
+    _log_analysis_jobs = max(0, _log_analysis_jobs - 1)
 
-            for i, col in enumerate(trigger_columns):
-                if col:
-                    value = "\n".join(col)
-                else:
-                    value = "\u200B"
-                embed.add_field(name="Triggers" if i == 0 else "\u200B", value=value, inline=True)
+def _get_log_progress():
+    # Started on first use; the manager process outlives worker pool restarts
+    global _log_progress_manager, _log_progress
+    if _log_progress is None:
+        _log_progress_manager = _LOG_ANALYSIS_MP_CONTEXT.Manager()
+        _log_progress = _log_progress_manager.dict()
+    return _log_progress
 
-        return embed
+async def run_log_analysis(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) in the analysis pool, in a slot reserved with
+    _reserve_log_analysis_slot(). The slot is released once the worker is
+    actually done, so a job given up on after LOG_ANALYSIS_MAX_WAIT_SECONDS
+    keeps counting against the queue until its process frees up. Per-job
+    time limits are up to func (analyze_log's `timeout`), which measures
+    from when the worker starts on it.
+    """
+    global _log_analysis_pool
+    loop = asyncio.get_running_loop()
+    try:
+        try:
+            job = _get_log_analysis_pool().submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died earlier; start a fresh pool
+            _log_analysis_pool = None
+            job = _get_log_analysis_pool().submit(func, *args, **kwargs)
+    except Exception:
+        _release_log_analysis_slot()
+        raise
+    job.add_done_callback(lambda _: loop.call_soon_threadsafe(_release_log_analysis_slot))
 
-    def has_next_page_items(self):
-        # Check if there are items on the next page
-        next_page_idx = (self.current_page + 1) * self.items_per_page * (COLUMNS if not self.show_aliases else COLUMNS_ALIAS)
-        return next_page_idx < len(self.current_items)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(job), timeout=LOG_ANALYSIS_MAX_WAIT_SECONDS)
+    except BrokenProcessPool:
+        _log_analysis_pool = None
+        raise
 
-    async def on_timeout(self):
-        # Disable all buttons after timeout
-        for item in self.children:
-            item.disabled = True
-        # Edit the message to update the disabled state of the buttons
-        await self.message.edit(view=self)
+# --- Log analysis result cache ---
+LOG_CACHE_MAX_BYTES = config.get("log_cache_max_bytes", 32 * 1024 * 1024)
+LOG_CACHE_TTL_SECONDS = config.get("log_cache_ttl_seconds", 6 * 60 * 60)
 
-class NextButton(discord.ui.Button):
-    def __init__(self, *args, **kwargs):
-        self.user_id = kwargs.pop('user_id')
-        super().__init__(*args, **kwargs)
+class LogResultCache:
+    """
+    LRU cache of finished analyses keyed by the SHA-256 of the decompressed
+    log, bounded by total size and entry age. Attachment (id, size) pairs are
+    kept as a cheap pre-key so a known attachment needs no download at all.
+    """
 
-    async def callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message("You did not trigger this list. Use !list to browse through commands.", ephemeral=True)
+    def __init__(self, max_bytes, ttl_seconds):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # digest -> {"stored_at", "analysis", "size", "attachments"}
+        self._attachments = {}  # (attachment_id, size) -> digest
+        self._total_bytes = 0
+
+    def get(self, digest):
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if time.monotonic() - entry["stored_at"] > self.ttl_seconds:
+            self._evict(digest)
+            return None
+        self._entries.move_to_end(digest)
+        return entry["analysis"]
+
+    def snapshot(self):
+        """digest -> analysis of every live entry, for looking up results that come back later."""
+        now = time.monotonic()
+        return {digest: entry["analysis"] for digest, entry in self._entries.items()
+                if now - entry["stored_at"] <= self.ttl_seconds}
+
+    def get_by_attachment(self, attachment: discord.Attachment):
+        digest = self._attachments.get((attachment.id, attachment.size))
+        return self.get(digest) if digest else None
+
+    def put(self, digest, analysis):
+        # Sized by what it renders to; the structure itself is a bit smaller
+        size = len(analysis.render_text()) + len(analysis.debug_text or "")
+        if size > self.max_bytes:
             return
-        view: PaginatorView = self.view
-        view.current_page += 1
-        embed = view.get_embed()
-        view.update_buttons()
-        await interaction.response.edit_message(embed=embed, view=view)
+        if digest in self._entries:
+            self._evict(digest)
+        self._entries[digest] = {
+            "stored_at": time.monotonic(),
+            "analysis": analysis,
+            "size": size,
+            "attachments": set(),
+        }
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def remember_attachment(self, attachment: discord.Attachment, digest):
+        entry = self._entries.get(digest)
+        if entry is not None:
+            key = (attachment.id, attachment.size)
+            entry["attachments"].add(key)
+            self._attachments[key] = digest
+
+    def _evict(self, digest):
+        entry = self._entries.pop(digest)
+        self._total_bytes -= entry["size"]
+        for key in entry["attachments"]:
+            self._attachments.pop(key, None)
+
+_log_result_cache = LogResultCache(LOG_CACHE_MAX_BYTES, LOG_CACHE_TTL_SECONDS)
 
-class PreviousButton(discord.ui.Button):
-    def __init__(self, *args, **kwargs):
-        self.user_id = kwargs.pop('user_id')
-        super().__init__(*args, **kwargs)
+# Constants
+COLUMNS = 3  # Number of columns to display
+COLUMNS_ALIAS = 2  # Number of columns to display for aliases
 
-    async def callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message("You did not trigger this list. Use !list to browse through commands.", ephemeral=True)
-            return
-        view: PaginatorView = self.view
-        view.current_page -= 1
-        embed = view.get_embed()
-        view.update_buttons()
-        await interaction.response.edit_message(embed=embed, view=view)
+def generate_session_hash():
+    return str(uuid.uuid4())[:8]  # Generate a short unique hash
 
-class ViewAliasesButton(discord.ui.Button):
-    def __init__(self, *args, **kwargs):
-        self.user_id = kwargs.pop('user_id')
-        super().__init__(*args, **kwargs)
+class TriggerListButton(discord.ui.DynamicItem[discord.ui.Button],
+                        template=r"triggerlist:(?P<action>mode|prev|next):(?P<user_id>\d+):(?P<mode>[ta]):(?P<page>\d+)"):
+    """
+    A !list button. The list state (who asked, trigger or alias view, page)
+    lives in the custom_id, so no view has to be kept around per message and
+    the buttons keep working after a restart.
+    """
 
-    async def callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message("You did not trigger this list. Use !list to browse through commands.", ephemeral=True)
-            return
-        view: PaginatorView = self.view
-        view.show_aliases = True
-        view.current_page = 0  # Reset to the first page
-        embed = view.get_embed()
-        view.update_buttons()
-        await interaction.response.edit_message(embed=embed, view=view)
+    def __init__(self, action, user_id, show_aliases, page, **kwargs):
+        self.action = action
+        self.user_id = user_id
+        self.show_aliases = show_aliases
+        self.page = page
+        mode = "a" if show_aliases else "t"
+        super().__init__(discord.ui.Button(custom_id=f"triggerlist:{action}:{user_id}:{mode}:{page}", **kwargs))
 
-class ViewTriggersButton(discord.ui.Button):
-    def __init__(self, *args, **kwargs):
-        self.user_id = kwargs.pop('user_id')
-        super().__init__(*args, **kwargs)
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match):
+        return cls(match["action"], int(match["user_id"]), match["mode"] == "a", int(match["page"]))
 
     async def callback(self, interaction: discord.Interaction):
         if interaction.user.id != self.user_id:
             await interaction.response.send_message("You did not trigger this list. Use !list to browse through commands.", ephemeral=True)
             return
-        view: PaginatorView = self.view
-        view.show_aliases = False
-        view.current_page = 0  # Reset to the first page
-        embed = view.get_embed()
-        view.update_buttons()
+        if self.action == "mode":
+            show_aliases, page = not self.show_aliases, 0  # Reset to the first page
+        else:
+            show_aliases, page = self.show_aliases, self.page + (1 if self.action == "next" else -1)
+        embed, view = trigger_list_message(self.user_id, show_aliases, page)
         await interaction.response.edit_message(embed=embed, view=view)
 
+def trigger_list_message(user_id, show_aliases=False, page=0):
+    """The embed and buttons for one page of !list, from the current trigger set."""
+    pages = trigger_set.list_pages.aliases if show_aliases else trigger_set.list_pages.triggers
+    # A reload may have shortened the list since the button was rendered
+    page = max(0, min(page, len(pages) - 1))
+    has_previous = page > 0
+    has_next = page < len(pages) - 1
+
+    view = discord.ui.View(timeout=None)
+    view.add_item(TriggerListButton("mode", user_id, show_aliases, page, style=discord.ButtonStyle.secondary,
+                                    label='Show Triggers' if show_aliases else 'Show Aliases'))
+    view.add_item(TriggerListButton("prev", user_id, show_aliases, page, label='Previous', disabled=not has_previous,
+                                    style=discord.ButtonStyle.primary if has_previous else discord.ButtonStyle.secondary))
+    view.add_item(TriggerListButton("next", user_id, show_aliases, page, label='Next', disabled=not has_next,
+                                    style=discord.ButtonStyle.primary if has_next else discord.ButtonStyle.secondary))
+    return pages[page], view
+
+# Every page of !list, built once per trigger set
+TriggerListPages = namedtuple("TriggerListPages", ["triggers", "aliases"])
+
+def _items_per_page(total_items):
+    if total_items <= 15:
+        return max(3, math.ceil(total_items / COLUMNS))
+    elif total_items <= 30:
+        return 5
+    elif total_items <= 60:
+        return 6
+    else:
+        return 9
+
+def _list_pages(items, items_per_page, columns, title, field_name, format_item):
+    page_size = items_per_page * columns
+    pages = []
+    for start_idx in range(0, max(1, len(items)), page_size):
+        embed = discord.Embed(title=title, color=discord.Color.blue())
+        items_page = items[start_idx:start_idx + page_size]
+        item_columns = [items_page[i * items_per_page:(i + 1) * items_per_page] for i in range(columns)]
+        for i, col in enumerate(item_columns):
+            value = "\n".join(format_item(item) for item in col) if col else "\u200B"
+            embed.add_field(name=field_name if i == 0 else "\u200B", value=value, inline=True)
+        pages.append(embed)
+    return pages
+
+def build_trigger_list_pages(triggers, triggers_esl, title="Available Triggers") -> TriggerListPages:
+    unique_triggers = []
+    alias_triggers_dict = {}
+    for responses in (triggers, triggers_esl):
+        # Collect triggers and aliases
+        names = []
+        aliases_dict = {}
+        for value in responses.values():
+            if value['triggers']:
+                original_trigger = value['triggers'][0]
+                names.append(original_trigger)
+                if len(value['triggers']) > 1:
+                    aliases_dict[original_trigger] = value['triggers'][1:]
+
+        # Remove duplicates and sort triggers; English first, then Spanish
+        unique_triggers += sorted(set(names))
+        alias_triggers_dict.update({key: sorted(aliases_dict[key]) for key in sorted(aliases_dict)})
+
+    alias_items = [(trigger, aliases) for trigger, aliases in alias_triggers_dict.items() if aliases]
+    # Both views keep the column height picked for the trigger list
+    items_per_page = _items_per_page(len(unique_triggers))
+    return TriggerListPages(
+        triggers=_list_pages(unique_triggers, items_per_page, COLUMNS, title, "Triggers", lambda trigger: trigger),
+        aliases=_list_pages(alias_items, items_per_page, COLUMNS_ALIAS, f"{title} - Aliases", "Aliases",
+                            lambda item: f"**{item[0]}**\n{', '.join(item[1])}"),
+    )
+
+# Load triggers from the JSON files at startup
+trigger_set = load_trigger_set()
+for problem in trigger_set.problems:
+    print(problem)
+_trigger_reload_lock = asyncio.Lock()
+_trigger_mtimes_checked = trigger_set.mtimes
+
+async def reload_triggers() -> str:
+    """
+    Rebuild the trigger set off the event loop and swap it in. A broken file
+    leaves the current set in place. Returns a report for the log / !reload.
+    """
+    global trigger_set
+    async with _trigger_reload_lock:
+        try:
+            new_set = await asyncio.to_thread(load_trigger_set)
+        except (OSError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+            return f"Trigger reload failed, keeping the current triggers: {e}"
+        except Exception as e:
+            # Something the validation didn't anticipate; still keep the working set
+            return f"Trigger reload failed, keeping the current triggers: {type(e).__name__}: {e}"
+        trigger_set = new_set
+
+    report = f"Reloaded {len(new_set.triggers)} English and {len(new_set.triggers_esl)} Spanish responses."
+    if new_set.problems:
+        report += "\n" + "\n".join(f"- {problem}" for problem in new_set.problems)
+    return report
+
+@tasks.loop(seconds=max(TRIGGER_RELOAD_SECONDS, 1))
+async def watch_trigger_files():
+    global _trigger_mtimes_checked
+    try:
+        mtimes = trigger_file_mtimes()
+    except OSError:
+        return  # mid-save; look again next time
+    # Try each saved version once, so a broken file isn't reported every tick
+    if mtimes != _trigger_mtimes_checked:
+        _trigger_mtimes_checked = mtimes
+        try:
+            print(await reload_triggers())
+        except Exception as e:
+            # An exception would end the loop and with it hot reloading
+            print(f"Trigger reload failed: {type(e).__name__}: {e}")
+
 def _github_repo_branch_url(repo: str, branch: str) -> str:
     # https://github.com/OWNER/REPO/tree/BRANCH
     if not repo or "/" not in repo:
@@ -363,7 +846,7 @@ def _dt_to_discord_rel(dt: datetime | None) -> str:
         dt = dt.replace(tzinfo=timezone.utc)
     return f"<t:{int(dt.timestamp())}:R>"
 
-def _get_latest_upstream_via_github() -> dict:
+async def _get_latest_upstream_via_github() -> dict:
     """
     Uses GitHub API to fetch latest commit on UPSTREAM_BRANCH.
     Returns dict with:
@@ -391,17 +874,12 @@ def _get_latest_upstream_via_github() -> dict:
     owner, name = UPSTREAM_REPO.split("/", 1)
 
     commits_url = f"https://api.github.com/repos/{owner}/{name}/commits"
-    r = requests.get(
-        commits_url,
-        headers=HEADERS,
-        params={"sha": UPSTREAM_BRANCH, "per_page": 1},
-        timeout=15
-    )
-    if r.status_code != 200:
-        info["error"] = f"GitHub API error listing commits: {r.status_code}"
+    status, commits = await github_get(commits_url, params={"sha": UPSTREAM_BRANCH, "per_page": 1})
+    if status != 200:
+        info["error"] = f"GitHub API error listing commits: {status}"
         return info
 
-    commits = r.json() or []
+    commits = commits or []
     if not commits:
         info["error"] = "No commits returned"
         return info
@@ -423,7 +901,7 @@ def _get_latest_upstream_via_github() -> dict:
     return info
 
 async def build_info_embed(client: discord.Client) -> discord.Embed:
-    upstream = await asyncio.to_thread(_get_latest_upstream_via_github)
+    upstream = await _get_latest_upstream_via_github()
 
     ping_ms = client.latency * 1000.0
     started_rel = _dt_to_discord_rel(BOT_START_TIME)
@@ -477,11 +955,18 @@ async def send_info_embed_to_channel(channel: discord.abc.Messageable, client: d
     embed = await build_info_embed(client)
     await channel.send(embed=embed)
 
+@client.event
+async def setup_hook():
+    # Route !list button clicks by custom_id, including on lists sent before a restart
+    client.add_dynamic_items(TriggerListButton)
+
 @client.event
 async def on_ready():
     global _boot_info_posted
     print(f'Logged in as {client.user}!')
     check_actions_staleness.start()   # kick off the daily loop
+    if TRIGGER_RELOAD_SECONDS and not watch_trigger_files.is_running():
+        watch_trigger_files.start()
 
     if _boot_info_posted:
         return
@@ -503,10 +988,12 @@ async def on_ready():
 
 async def handle_log_file(message):
     if len(message.attachments) == 0:
-        for response in triggers.values():
-            if any(trigger.lower() in message.content.lower() for trigger in response['triggers']):
-                await handle_response(message.channel, response)
-                break  # Stop after sending one trigger action
+        # Send the first response (in triggers.json order) with a trigger anywhere in the message
+        current = trigger_set
+        found = current.trigger_matcher.find(message.content.lower())
+        if found:
+            position = min(current.trigger_positions[trigger] for trigger in found)
+            await handle_response(message.channel, current.trigger_responses[position])
         return
 
     log_file = message.attachments[0]
@@ -517,48 +1004,178 @@ async def handle_log_file(message):
         await message.channel.send("Invalid file type. Please upload a `.log` or `.log.gz` file.")
         return
 
-    # Generate a unique log file name by appending the session hash
-    log_file_name = f"{os.path.splitext(log_file.filename)[0]}_{session_hash}.log"
-    log_file_path = os.path.join(TEMP_FOLDER, log_file_name)
-
-    # Save the file to a temporary location
-    await log_file.save(log_file_path if not log_file.filename.endswith(".gz") else log_file_path + ".gz")
+    # Refuse oversized uploads before downloading anything
+    if log_file.size > LOG_MAX_ATTACHMENT_BYTES:
+        await message.channel.send(
+            f"That log is too big to check ({log_file.size / (1024 * 1024):.0f} MB, "
+            f"the limit is {LOG_MAX_ATTACHMENT_BYTES / (1024 * 1024):.0f} MB)."
+        )
+        return
 
-    decompressed_log_path = log_file_path
+    # Same attachment already analyzed (e.g. a forwarded message)
+    cached = _log_result_cache.get_by_attachment(log_file)
+    if cached:
+        await send_log_analysis(message.channel, log_file.filename, cached)
+        return
 
-    # If the file is a .gz file, extract it
-    if log_file.filename.endswith(".gz"):
-        decompressed_log_path = log_file_path  # Remove ".gz" from the final path
-        with gzip.open(log_file_path + ".gz", 'rb') as f_in:
-            with open(decompressed_log_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        os.remove(log_file_path + ".gz")  # Clean up the original .gz file after decompression
+    queue_full_message = "**Analysis queue full!** Too many logs are being checked right now, try again in a few minutes."
+    slot_held = False
+    log_file_path = None
+    placeholder = None  # progress message, replaced by the result
+    digest = None  # known up front for small logs, from the worker for big ones
 
-    # Call the analyze_log_file function directly
     try:
-        # Now analyze_log_file returns (summary, debug_txt_path)
-        summary, debug_txt = analyze_log_file(decompressed_log_path)
+        if log_file.size <= LOG_IN_MEMORY_MAX_BYTES:
+            # Small logs never touch the disk; the analyzer reads the bytes (gzipped or not) directly
+            log_source = await log_file.read()
+
+            # Identical logs (re-posts, .log vs .log.gz) share one cached result, and
+            # are answered right away even when the queue is full
+            digest = await asyncio.to_thread(hash_log_file, log_source)
+            cached = _log_result_cache.get(digest)
+            if cached:
+                _log_result_cache.remember_attachment(log_file, digest)
+                await send_log_analysis(message.channel, log_file.filename, cached)
+                return
+
+            if not _reserve_log_analysis_slot():
+                await message.channel.send(queue_full_message)
+                return
+            slot_held = True
+        else:
+            # Don't even download it if the workers are already backed up
+            if not _reserve_log_analysis_slot():
+                await message.channel.send(queue_full_message)
+                return
+            slot_held = True
+
+            # Generate a unique log file name by appending the session hash
+            log_file_name = f"{os.path.splitext(log_file.filename)[0]}_{session_hash}.log"
+            log_file_path = os.path.join(TEMP_FOLDER, log_file_name)
+
+            # Gzipped logs are kept as-is; the analyzer streams through them directly
+            if log_file.filename.endswith(".gz"):
+                log_file_path += ".gz"
+
+            # Save the file to a temporary location
+            await log_file.save(log_file_path)
+            log_source = log_file_path
+
+        # Non-RB3 logs are turned away after reading just the start of the file
+        if not await asyncio.to_thread(probe_log_header, log_source):
+            await message.channel.send(NOT_RB3_LOG_MESSAGE)
+            return
+
+        if digest is None:
+            # Big logs are hashed by the worker, which skips the analysis if the
+            # result is already known
+            cached_analyses = _log_result_cache.snapshot()
+            job_args = (hash_and_analyze_log, log_source)
+            job_kwargs = {"known_digests": frozenset(cached_analyses), "timeout": LOG_ANALYSIS_TIMEOUT_SECONDS}
+        else:
+            job_args = (analyze_log, log_source)
+            job_kwargs = {"timeout": LOG_ANALYSIS_TIMEOUT_SECONDS}
+        shared_progress = None
+        if log_file.size >= LOG_PROGRESS_MIN_BYTES:
+            # Show that the log is being worked on so nobody uploads it again
+            placeholder = await message.channel.send(embed=log_progress_embed(None))
+            shared_progress = _get_log_progress()
+        # run_log_analysis takes the slot over: it's released when the worker finishes
+        slot_held = False
+        if shared_progress is not None:
+            result = await run_log_analysis_with_progress(placeholder, shared_progress, session_hash, *job_args, **job_kwargs)
+        else:
+            result = await run_log_analysis(*job_args, **job_kwargs)
+        if digest is None:
+            digest, analysis = result
+            if analysis is None:
+                analysis = cached_analyses[digest]
+        else:
+            analysis = result
+        # Known results only need their LRU position refreshed, unless they expired meanwhile
+        if _log_result_cache.get(digest) is None:
+            _log_result_cache.put(digest, analysis)
+        _log_result_cache.remember_attachment(log_file, digest)
 
-        # Send the short summary as before
-        embed = discord.Embed(title="Log Analysis Result", color=discord.Color.blue())
-        embed.description = summary[:4096]
-        await message.channel.send(embed=embed)
+        await send_log_analysis(message.channel, log_file.filename, analysis, placeholder)
 
-        # If we wrote out a debug file, upload it
-        if debug_txt:
-            await message.channel.send("Full debug info:", file=discord.File(debug_txt))
-            os.remove(debug_txt)
+    except (asyncio.TimeoutError, AnalysisTimeout):
+        await send_or_replace(message.channel, placeholder, f"Log analysis timed out after {LOG_ANALYSIS_TIMEOUT_SECONDS} seconds.")
 
     except Exception as e:
-        await message.channel.send(f"Error analyzing log file: {e}")
+        await send_or_replace(message.channel, placeholder, f"Error analyzing log file: {e}")
 
     finally:
-        # Clean up the temporary directory
-        if os.path.exists(decompressed_log_path):
-            os.remove(decompressed_log_path)
+        if slot_held:
+            _release_log_analysis_slot()
+
+        # Clean up the temporary directory (a timed-out worker may still hold it open)
+        try:
+            if log_file_path and os.path.exists(log_file_path):
+                os.remove(log_file_path)
+        except OSError:
+            pass
 
     return
 
+def log_progress_embed(progress):
+    embed = discord.Embed(title="Analyzing log...", color=discord.Color.light_grey())
+    if progress is None:
+        embed.description = "Waiting for a free worker. No need to upload it again!"
+    else:
+        done, total = progress
+        percent = done * 100 // total if total else 0
+        embed.description = f"{percent}% ({done / (1024 * 1024):.0f} of {total / (1024 * 1024):.0f} MB). No need to upload it again!"
+    return embed
+
+async def update_log_progress(placeholder, shared_progress, progress_key):
+    # Edit the progress message now and then; runs until cancelled
+    shown = None
+    while True:
+        await asyncio.sleep(LOG_PROGRESS_EDIT_SECONDS)
+        progress = await asyncio.to_thread(shared_progress.get, progress_key)
+        if progress is None or progress == shown:
+            continue
+        try:
+            await placeholder.edit(embed=log_progress_embed(progress))
+        except discord.HTTPException:
+            return
+        shown = progress
+
+async def run_log_analysis_with_progress(placeholder, shared_progress, progress_key, func, *args, **kwargs):
+    """run_log_analysis(func, ...) that keeps `placeholder` updated with the progress func reports."""
+    updater = asyncio.create_task(update_log_progress(placeholder, shared_progress, progress_key))
+    try:
+        return await run_log_analysis(func, *args, progress=MappingProgress(shared_progress, progress_key), **kwargs)
+    finally:
+        updater.cancel()
+        await asyncio.to_thread(shared_progress.pop, progress_key, None)
+
+async def send_or_replace(channel, placeholder, content):
+    # Put a plain message in place of the progress message, if there is one
+    if placeholder is None:
+        await channel.send(content)
+    else:
+        await placeholder.edit(content=content, embed=None)
+
+async def send_log_analysis(channel, log_filename, analysis, placeholder=None):
+    # Logs that couldn't be analyzed just get the reason
+    if not analysis.ok:
+        await send_or_replace(channel, placeholder, analysis.error)
+        return
+
+    # Send the short summary as before, over the progress message if there is one
+    embed = discord.Embed(color=discord.Color.blue(), **analysis.render_embed())
+    if placeholder is None:
+        await channel.send(embed=embed)
+    else:
+        await placeholder.edit(embed=embed)
+
+    # Upload the thread context / call stack report, if there was one
+    if analysis.debug_text:
+        debug_file = discord.File(io.BytesIO(analysis.debug_text.encode("utf-8")), filename=f"{log_filename.removesuffix('.gz')}.debug.txt")
+        await channel.send("Full debug info:", file=debug_file)
+
 @client.event
 async def on_message(message):
     if message.author == client.user:
@@ -586,59 +1203,77 @@ async def on_message(message):
             print(f"Failed to publish message {message.id} in channel {message.channel.id}: {e}")
         return
 
-    message_content = message.content.strip()
-    if not message_content:
+    # Check for a command anywhere in the message; most messages have none
+    match = COMMAND_RE.search(message.content)
+    if match is None:
         return
+    prefix = match.group(1)
+    command = match.group(2).lower()
 
-    # Normalize the message content to lower case
-    message_content_lower = message_content.lower()
+    # Handle special commands like log
+    if command == 'log':
+        await handle_log_file(message)
+        return
 
-    # List of valid prefixes
-    prefixes = ['!', '¡']
+    if command == 'actions':
+        await check_actions_staleness()  # manual trigger
+        return
 
-    # Check for commands anywhere in the message
-    words = message_content_lower.split()
+    if command == 'reload':
+        if is_trigger_admin(message.author):
+            await message.channel.send(await reload_triggers())
+        return
 
-    for word in words:
-        if any(word.startswith(prefix) for prefix in prefixes):
-            # Identify the prefix used
-            for prefix in prefixes:
-                if word.startswith(prefix):
-                    command = word[len(prefix):].strip()
-                    break
+    # Handle special commands like list
+    if command in ["list", "triggers", "commands", "help", "cmd", "cmds"]:
+        await send_trigger_list(message.channel, message.author.id)
+        return
 
-            # Handle special commands like log
-            if command == 'log':
-                await handle_log_file(message)
-                return
+    if command in ["hugh", "progress"]:
+        info = await get_decomp_info()
+        await message.channel.send(info)
+        return
 
-            if command == 'actions':
-                await check_actions_staleness()  # manual trigger
-                return
+    if command == 'info':
+        await send_info_embed_to_channel(message.channel, client)
+        return
 
-            # Handle special commands like list
-            if command in ["list", "triggers", "commands", "help", "cmd", "cmds"]:
-                await send_trigger_list(message.channel, message.author.id)
-                return
+    # Now handle triggers, all from the same trigger set even if a reload lands meanwhile
+    current = trigger_set
+    if prefix == '!':
+        # Process English triggers
+        await process_trigger(message.channel, command, current)
+    else:
+        # Process ESL triggers
+        await process_esl_trigger(message.channel, command, current)
+
+async def _stale_actions_run(owner, name):
+    """(display name, date, url) of the repo's latest run if it's stale and has artifacts, else None."""
+    runs_url = f"https://api.github.com/repos/{owner}/{name}/actions/runs?per_page=1"
+    status, data = await github_get(runs_url)
+    if status != 200:
+        return None
+    runs = data.get("workflow_runs", [])
+    if not runs:
+        return None
 
-            if command in ["hugh", "progress"]:
-                info = await asyncio.to_thread(get_decomp_info)
-                await message.channel.send(info)
-                return
+    latest = runs[0]
+    run_id = latest["id"]
+    created = datetime.fromisoformat(latest["created_at"].replace("Z", "+00:00"))
+    # Recent runs are fine either way, no need to look at their artifacts
+    if (datetime.now(timezone.utc) - created).days < 89:
+        return None
 
-            if command == 'info':
-                await send_info_embed_to_channel(message.channel, client)
-                return
+    # ✅ Check if that run has any artifacts
+    artifacts_url = f"https://api.github.com/repos/{owner}/{name}/actions/runs/{run_id}/artifacts"
+    status, artifact_data = await github_get(artifacts_url)
+    if status != 200:
+        return None
+    if not artifact_data.get("artifacts"):  # skip repos with no artifacts
+        return None
 
-            # Now handle triggers
-            if prefix in ['!']:
-                # Process English triggers
-                await process_trigger(message.channel, command, triggers_map, esl_triggers_with_exclamation_map)
-                return
-            elif prefix == '¡':
-                # Process ESL triggers
-                await process_esl_trigger(message.channel, command, triggers_esl_map)
-                return
+    display = name if owner == "hmxmilohax" else f"{owner}/{name}"
+    return display, created.date(), latest["html_url"]
 
 @tasks.loop(hours=24)
 async def check_actions_staleness():
@@ -646,12 +1281,12 @@ async def check_actions_staleness():
     Checks all repos under hmxmilohax (minus IGNORED_REPOS + stale_repo_ignore_list) 
     + any EXTRA_REPOS for their most recent GitHub Actions run.
     """
-    stale = []
-
-    # 1) List all hmxmilohax repos
-    repos_url = "https://api.github.com/users/hmxmilohax/repos?per_page=100"
-    resp = requests.get(repos_url, headers=HEADERS)
-    resp.raise_for_status()
+    # 1) List all hmxmilohax repos, all pages of them
+    repos_url = "https://api.github.com/users/hmxmilohax/repos"
+    status, repos = await github_get_all(repos_url, params={"per_page": 100})
+    if status != 200:
+        print(f"Stale actions check: GitHub API error listing repos: {status}")
+        return
     
     # Get the config ignore list
     config_ignored = [r.lower() for r in config.get('stale_repo_ignore_list', [])]
@@ -662,7 +1297,7 @@ async def check_actions_staleness():
     # build a list of (owner, name), skipping ignored
     monitored = [
         ("hmxmilohax", r["name"])
-        for r in resp.json()
+        for r in repos
         if r["name"].lower() not in all_ignored
     ]
 
@@ -680,32 +1315,16 @@ async def check_actions_staleness():
         if (owner, name) not in monitored:
             monitored.append((owner, name))
 
-    # 3) Check each one’s latest run
-    for owner, name in monitored:
-        runs_url = f"https://api.github.com/repos/{owner}/{name}/actions/runs?per_page=1"
-        r2 = requests.get(runs_url, headers=HEADERS)
-        if r2.status_code != 200:
-            continue
-        runs = r2.json().get("workflow_runs", [])
-        if not runs:
-            continue
-
-        latest = runs[0]
-        run_id = latest["id"]
-        created = datetime.fromisoformat(latest["created_at"].replace("Z", "+00:00"))
-
-        # ✅ Check if that run has any artifacts
-        artifacts_url = f"https://api.github.com/repos/{owner}/{name}/actions/runs/{run_id}/artifacts"
-        r3 = requests.get(artifacts_url, headers=HEADERS)
-        if r3.status_code != 200:
-            continue
-        artifact_data = r3.json()
-        if not artifact_data.get("artifacts"):  # skip repos with no artifacts
-            continue
-
-        if (datetime.now(timezone.utc) - created).days >= 89:
-            display = name if owner == "hmxmilohax" else f"{owner}/{name}"
-            stale.append((display, created.date(), latest["html_url"]))
+    # 3) Check each one’s latest run, many repos at a time
+    results = await asyncio.gather(*(_stale_actions_run(owner, name) for owner, name in monitored),
+                                   return_exceptions=True)
+    stale = []
+    for (owner, name), result in zip(monitored, results):
+        if isinstance(result, Exception):
+            # One unreachable repo shouldn't sink the whole report
+            print(f"Stale actions check failed for {owner}/{name}: {result!r}")
+        elif result:
+            stale.append(result)
 
     # 4) Build and send a pretty embed
     channel = client.get_channel(1186453136731287642)
@@ -732,95 +1351,296 @@ async def check_actions_staleness():
 
     await channel.send(embed=embed)
 
-async def process_trigger(channel, command, triggers_map, esl_triggers_with_exclamation_map):
+async def process_trigger(channel, command, trigger_set):
     command_lower = command.lower()
 
-    if command_lower in triggers_map:
-        response = triggers_map[command_lower]
+    if command_lower in trigger_set.triggers_map:
+        response = trigger_set.triggers_map[command_lower]
         await handle_response(channel, response)
         return
 
-    if command_lower in esl_triggers_with_exclamation_map:
-        response = esl_triggers_with_exclamation_map[command_lower]
+    if command_lower in trigger_set.esl_triggers_with_exclamation_map:
+        response = trigger_set.esl_triggers_with_exclamation_map[command_lower]
         await handle_response(channel, response)
         return
 
-    if command_lower in triggers_esl_map:
-        response = triggers_esl_map[command_lower]
+    if command_lower in trigger_set.triggers_esl_map:
+        response = trigger_set.triggers_esl_map[command_lower]
         await handle_response(channel, response)
         return
 
     print(f"Command '!{command}' not found.")
+    await suggest_command(channel, '!', command_lower, trigger_set.trigger_index)
 
-async def process_esl_trigger(channel, command, triggers_esl_map):
+async def process_esl_trigger(channel, command, trigger_set):
     command_lower = command.lower()
 
-    if command_lower in triggers_esl_map:
-        response = triggers_esl_map[command_lower]
+    if command_lower in trigger_set.triggers_esl_map:
+        response = trigger_set.triggers_esl_map[command_lower]
         await handle_response(channel, response)
         return
 
     print(f"Command '¡{command}' not found.")
+    await suggest_command(channel, '¡', command_lower, trigger_set.esl_trigger_index)
+
+_last_suggestion = {}  # channel id -> monotonic time of the last suggestion
+
+async def suggest_command(channel, prefix, command, index):
+    suggestions = suggest_triggers(index, command)
+    if not suggestions:
+        return
+    now = time.monotonic()
+    if now - _last_suggestion.get(channel.id, -TRIGGER_SUGGESTION_COOLDOWN_SECONDS) < TRIGGER_SUGGESTION_COOLDOWN_SECONDS:
+        return
+    _last_suggestion[channel.id] = now
+    names = ", ".join(f"`{prefix}{name}`" for name in suggestions)
+    await channel.send(f"Command `{prefix}{command}` not found. Did you mean {names}?")
 
 async def send_trigger_list(channel, user_id):
-    # Collect English triggers and aliases
-    english_triggers = []
-    english_aliases_dict = {}
-    for value in triggers.values():
-        if value['triggers']:
-            original_trigger = value['triggers'][0]
-            english_triggers.append(original_trigger)
-            if len(value['triggers']) > 1:
-                english_aliases_dict[original_trigger] = value['triggers'][1:]
-
-    # Collect Spanish triggers and aliases
-    spanish_triggers = []
-    spanish_aliases_dict = {}
-    for value in triggers_esl.values():
-        if value['triggers']:
-            original_trigger = value['triggers'][0]
-            spanish_triggers.append(original_trigger)
-            if len(value['triggers']) > 1:
-                spanish_aliases_dict[original_trigger] = value['triggers'][1:]
-
-    # Remove duplicates and sort triggers
-    english_triggers = sorted(set(english_triggers))
-    spanish_triggers = sorted(set(spanish_triggers))
-    english_aliases_dict = {key: sorted(english_aliases_dict[key]) for key in sorted(english_aliases_dict)}
-    spanish_aliases_dict = {key: sorted(spanish_aliases_dict[key]) for key in sorted(spanish_aliases_dict)}
-
-    # Combine English and Spanish triggers
-    unique_triggers = english_triggers + spanish_triggers
-    alias_triggers_dict = {**english_aliases_dict, **spanish_aliases_dict}
-
-    # Create pagination view
-    view = PaginatorView(unique_triggers, alias_triggers_dict, user_id=user_id)
-    embed = view.get_embed()
-    view.message = await channel.send(embed=embed, view=view)
+    # Paging is handled by TriggerListButton, nothing to keep track of here
+    embed, view = trigger_list_message(user_id)
+    await channel.send(embed=embed, view=view)
+
+
+# --- Media upload cache ---
+# Trigger media is uploaded once; later triggers post the CDN link of that upload
+MEDIA_CACHE_PATH = config.get("media_cache_path", "media_cache.json")
+# Re-upload this long before Discord's signed link expires
+MEDIA_URL_EXPIRY_MARGIN_SECONDS = 60 * 60
+
+def _hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cdn_url_expiry(url):
+    # Signed attachment links carry their expiry as a hex timestamp in "ex"
+    values = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get("ex")
+    try:
+        return int(values[0], 16) if values else None
+    except ValueError:
+        return None
 
+class MediaUploadCache:
+    """
+    Remembers the CDN URL of the first upload of each media file, saved to
+    MEDIA_CACHE_PATH so it survives restarts. An entry is dropped when the
+    file's contents change (checked by size/mtime, confirmed by SHA-256) or
+    its signed link is about to expire.
+    """
 
-async def handle_response(channel, response):
-    if text := response.get("text"):
-        await send_long_message(channel, text)
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)  # file -> {"url", "sha256", "size", "mtime"}
+        except (OSError, ValueError):
+            self._entries = {}
+        self._save_lock = asyncio.Lock()
+
+    async def get(self, file, file_path):
+        entry = self._entries.get(file)
+        if entry is None:
+            return None
+
+        expires = _cdn_url_expiry(entry["url"])
+        if expires is not None and expires - time.time() < MEDIA_URL_EXPIRY_MARGIN_SECONDS:
+            await self._drop(file)
+            return None
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    for file in response.get("files", []):
-        file_path = os.path.join(base_dir, file)
-        if os.path.exists(file_path):
-            await channel.send(file=discord.File(file_path))
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Deleted since the triggers were loaded
+            await self._drop(file)
+            return None
+        if (stat.st_size, stat.st_mtime) != (entry["size"], entry["mtime"]):
+            # Touched on disk; only a real content change invalidates the upload
+            if stat.st_size != entry["size"] or await asyncio.to_thread(_hash_file, file_path) != entry["sha256"]:
+                await self._drop(file)
+                return None
+            entry["mtime"] = stat.st_mtime
+            await self._save()
+        return entry["url"]
+
+    async def put(self, file, file_path, url):
+        try:
+            stat = os.stat(file_path)
+            sha256 = await asyncio.to_thread(_hash_file, file_path)
+        except OSError:
+            return
+        self._entries[file] = {"url": url, "sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime}
+        await self._save()
+
+    async def _drop(self, file):
+        self._entries.pop(file, None)
+        await self._save()
+
+    async def _save(self):
+        # One write at a time, each of the entries as they are when it starts
+        async with self._save_lock:
+            data = json.dumps(self._entries, indent=2)
+            try:
+                await asyncio.to_thread(_write_file_atomically, self.path, data)
+            except OSError as e:
+                print(f"Failed to save {self.path}: {e}")
+
+def _write_file_atomically(path, data):
+    # A temp file of its own, so concurrent writers never replace each other's
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+_media_upload_cache = MediaUploadCache(MEDIA_CACHE_PATH)
+
+class _OutgoingMessage:
+    # One message of a reply being packed: its text and the files uploaded with it
+    def __init__(self, content=None):
+        self.content = content
+        self.uploads = []  # (file, file_path, size)
+        self.upload_bytes = 0
+
+def _pack_reply(chunks, items, missing):
+    """
+    Pack a reply into as few messages as possible without reordering it:
+    the text chunks, then each file in the order the response lists it,
+    either as ("link", url) to an earlier upload or as ("upload", entry).
+    Links join the text before them; uploads ride along on the message
+    before them until it holds MESSAGE_FILE_LIMIT files or
+    MAX_UPLOAD_BYTES_PER_MESSAGE. Nothing is added to a message's text once it
+    carries files, since the text would show up above them.
+    """
+    messages = [_OutgoingMessage(chunk) for chunk in chunks]
+
+    def add_line(line):
+        last = messages[-1] if messages else None
+        if last and not last.uploads and last.content and len(last.content) + 1 + len(line) <= MESSAGE_CHAR_LIMIT:
+            last.content += "\n" + line
         else:
-            await channel.send(f"Sorry, I couldn't find the file: {file}")
+            messages.append(_OutgoingMessage(line))
+
+    def add_upload(entry):
+        size = entry[2]
+        last = messages[-1] if messages else None
+        if (last is None or len(last.uploads) >= MESSAGE_FILE_LIMIT
+                or last.upload_bytes + size > MAX_UPLOAD_BYTES_PER_MESSAGE):
+            last = _OutgoingMessage()
+            messages.append(last)
+        last.uploads.append(entry)
+        last.upload_bytes += size
+
+    for kind, value in items:
+        if kind == "link":
+            add_line(value)
+        else:
+            add_upload(value)
+    for file in missing:
+        add_line(f"Sorry, I couldn't find the file: {file}")
+    return messages
 
-async def send_long_message(channel, text):
-    while len(text) > 2000:
-        split_index = text.rfind('\n', 0, 2000)
-        if split_index == -1:
-            split_index = 2000
-        await channel.send(text[:split_index])
-        text = text[split_index:].lstrip('\n')
+async def send_reply(channel, plan: ReplyPlan):
+    """
+    Send a planned reply in as few messages as possible (see _pack_reply),
+    linking media that was uploaded before instead of uploading it again.
+    An upload that fails doesn't take its message's text down with it.
+    Returns the first message sent.
+    """
+    items = []
+    missing = list(plan.missing)
+    for file, file_path, size in plan.files:
+        if not os.path.exists(file_path):
+            # Deleted since the plan was made
+            missing.append(file)
+            continue
+        url = await _media_upload_cache.get(file, file_path)
+        if url:
+            items.append(("link", url))
+        else:
+            items.append(("upload", (file, file_path, size)))
 
-    if text:
-        await channel.send(text)
+    first = None
+    for message in _pack_reply(plan.chunks, items, missing):
+        if not message.uploads:
+            sent = await channel.send(message.content)
+            first = first or sent
+            continue
+
+        try:
+            sent = await channel.send(message.content,
+                                      files=[discord.File(file_path) for _, file_path, _ in message.uploads])
+        except (OSError, discord.HTTPException) as e:
+            # Too big, gone, or refused: still get the text out, and say what's missing
+            print(f"Failed to upload {', '.join(file for file, _, _ in message.uploads)}: {e}")
+            lines = [f"Sorry, I couldn't send the file: {file}" for file, _, _ in message.uploads]
+            text = "\n".join(filter(None, [message.content, *lines]))
+            for chunk in split_message(text):
+                sent = await channel.send(chunk)
+                first = first or sent
+            continue
+        first = first or sent
+        # Attachments come back in the order they were sent
+        for (file, file_path, _), attachment in zip(message.uploads, sent.attachments):
+            await _media_upload_cache.put(file, file_path, attachment.url)
+    return first
+
+# --- Trigger cooldown ---
+# A response already sent to a channel this recently is answered with a link
+# to that message instead of being sent again (0 = off)
+TRIGGER_COOLDOWN_SECONDS = config.get("trigger_cooldown_seconds", 30)
+TRIGGER_COOLDOWN_MAX_ENTRIES = config.get("trigger_cooldown_max_entries", 1024)
+
+class TriggerCooldowns:
+    """
+    LRU of the last time each response was sent to each channel, bounded to
+    max_entries. Entries hold on to their response, so the id(response) in the
+    key can't be reused by another response while the entry is alive.
+    """
+
+    def __init__(self, seconds, max_entries):
+        self.seconds = seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (channel_id, id(response)) -> (response, sent_at, jump_url)
+
+    def recent(self, channel_id, response):
+        """Jump URL of the answer sent within the cooldown, or None."""
+        key = (channel_id, id(response))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def record(self, channel_id, response, jump_url):
+        key = (channel_id, id(response))
+        self._entries[key] = (response, time.monotonic(), jump_url)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+_trigger_cooldowns = TriggerCooldowns(TRIGGER_COOLDOWN_SECONDS, TRIGGER_COOLDOWN_MAX_ENTRIES)
+
+async def handle_response(channel, response):
+    if TRIGGER_COOLDOWN_SECONDS:
+        jump_url = _trigger_cooldowns.recent(channel.id, response)
+        if jump_url:
+            await channel.send(f"Answered just above: {jump_url}")
+            return
+
+    # Responses from the current trigger set were planned when it loaded
+    plan = trigger_set.reply_plans.get(id(response)) or plan_reply(response)
+    sent = await send_reply(channel, plan)
+    if TRIGGER_COOLDOWN_SECONDS and sent:
+        _trigger_cooldowns.record(channel.id, response, sent.jump_url)
 
 def _now_utc():
     return datetime.now(timezone.utc)
@@ -1034,6 +1854,11 @@ async def _ban_and_report_for_spam(message: discord.Message, evidence: list[dict
     await report_ch.send(embed=embed)
 
 
+def is_trigger_admin(member) -> bool:
+    # Server admins and managers only; DMs have no permissions to check
+    perms = getattr(member, "guild_permissions", None)
+    return perms is not None and (perms.administrator or perms.manage_guild)
+
 async def spam_watchdog(message: discord.Message) -> bool:
     if not message.guild:
         return False
@@ -1195,5 +2020,19 @@ def _scam_pitch_allowed_in_channel(channel_id: int) -> bool:
     return channel_id in SCAM_PITCH_CHANNEL_ALLOWLIST
 
 
-# Run the bot
-client.run(config['bot_token'])
+# Run the bot (guarded so log analysis worker processes can import this module safely)
+async def main():
+    async with client:
+        try:
+            await client.start(config['bot_token'])
+        finally:
+            await close_http_session()
+            await _github_response_cache.save()
+
+if __name__ == "__main__":
+    # What client.run() does, plus closing the HTTP session on the way out
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
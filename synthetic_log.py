@@ -0,0 +1,154 @@
+"""
+Synthetic RPCS3 logs for exercising analyze_log.
+
+The generated log looks like a real Rock Band 3 session: emulator header,
+boot lines, a "Used configuration" dump and then a long stream of regular
+log lines. Every detector in analyze_log's rule tables shows up at least
+once, and the filler can be grown to any size to measure throughput.
+"""
+import argparse
+import gzip
+import random
+
+from analyze_log import (
+    CORE_RULES,
+    EXPECTED_LINES,
+    TITLE_LINE,
+    SERIAL_LINE,
+    GPU_LINE,
+    FIRMWARE_LINE,
+    SPANISH_LINE,
+    LOCAL_BUILD_LINE,
+    CUSTOM_CONFIG_LINE,
+    USED_CONFIG_LINE,
+)
+
+# Values fed to the rules that read a number off the line; one per outcome
+NUMERIC_SAMPLES = {
+    "Vblank Rate: ": ("50", "60", "120"),
+    "Desired Audio Buffer Duration: ": ("32", "150"),
+    "Driver Wake-Up Delay: ": ("10", "20", "30"),
+}
+
+FILLER_LINES = (
+    "·! {ts} {{PPU[0x1000000] Thread (main_thread) [0x0084b2a0]}} sys_ppu_thread: _sys_ppu_thread_exit(errorcode=0x{n:x})",
+    "·W {ts} {{SPU[0x2000100] Thread (CellSpursKernel1) [0x00000a8c]}} sys_spu: sys_spu_thread_group_join(): group {n}",
+    "·E {ts} {{PPU[0x1000003] Thread (rb3_audio) [0x00b3c1d0]}} cellAudio: cellAudioPortStart(portNum={n}) -> CELL_AUDIO_ERROR_PORT_ALREADY_RUN",
+    "·! {ts} {{rsx::thread}} RSX: Vertex buffer {n} overflowed, flushing",
+    "·W {ts} {{PPU[0x1000001] Thread (net_thread) [0x006f0010]}} sceNp: sceNpManagerGetStatus(status=*0x{n:x})",
+    "·! {ts} {{PPU[0x1000000] Thread (main_thread) [0x00612a40]}} cellFs: cellFsOpen(path=\"/dev_hdd0/game/BLUS30463/USRDIR/songs/{n}.mid\") -> CELL_OK",
+)
+
+def _timestamp(line_number):
+    seconds = line_number // 200
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.{line_number % 1000000:06d}"
+
+def _rule_lines(rng):
+    """One line per literal of every core rule, numeric rules once per sample value."""
+    lines = []
+    for rule in CORE_RULES:
+        for literal in rule.literals:
+            for value in NUMERIC_SAMPLES.get(literal, ("",)):
+                lines.append(f"{literal}{value}")
+    rng.shuffle(lines)
+    return lines
+
+def header_lines(rng, spanish=False, local_build=False, firmware="4.85"):
+    """Emulator header, boot lines and the config dump that opens the core section."""
+    lines = [
+        "RPCS3 v0.0.32-17020-9f8e7d6c Alpha | HEAD",
+        "AMD Ryzen 7 5800X 8-Core Processor | 16 Threads | 31.9 GiB RAM | TSC: 3.800GHz | AVX+ | AVX-512",
+        "Operating system: Windows, Major: 10, Minor: 0, Build: 22631, Service Pack: none, Compatibility mode: 0",
+        "·! 0:00:00.000000 SYS: Using RPCS3 config file: C:\\Games\\rpcs3\\config\\config.yml",
+    ]
+    if local_build:
+        # The updater's startup line, not part of the version line
+        lines.append(f"·! 0:00:00.005000 UPDATER: Skipped automatic update check: {LOCAL_BUILD_LINE}")
+    lines += [
+        f"·! 0:00:00.010000 {GPU_LINE} 'NVIDIA GeForce RTX 3070'",
+        f"·! 0:00:01.000000 {TITLE_LINE}",
+        f"·! 0:00:01.000001 {SERIAL_LINE}",
+        f"·! 0:00:01.000002 {FIRMWARE_LINE}{firmware}",
+        f"·! 0:00:01.000003 SYS: {CUSTOM_CONFIG_LINE}: C:\\Games\\rpcs3\\config\\custom_configs\\config_BLUS30463.yml",
+        f"·! 0:00:01.000004 SYS: {USED_CONFIG_LINE}:",
+        "Core:",
+    ]
+    # Leave about half of the expected settings out so the non-default checks fire too
+    for literal, _, _, _ in EXPECTED_LINES:
+        if rng.random() < 0.5:
+            lines.append(f"  {literal}")
+    lines.append(f"  {SPANISH_LINE}" if spanish else "  Language: English (US)")
+    return lines
+
+def crash_lines():
+    """A thread context block followed by a call stack, as RPCS3 writes on a crash."""
+    lines = ["·F 0:10:00.000000 {PPU[0x1000000] Thread (main_thread) [0x00c0ffee]} VM: Access violation reading location 0x0 (unmapped memory)",
+             "Thread context:"]
+    lines += [f"r{n} = 0x{n * 0x1111:016x}" for n in range(32)]
+    lines.append("Call stack:")
+    lines += [f"> from 0x{0x00c0ffee + n * 4:08x} (0x0)" for n in range(16)]
+    return lines
+
+def generate_log(path, size_bytes, seed=0, compress=False):
+    """
+    Write a synthetic RB3 log of roughly `size_bytes` (uncompressed) to `path`
+    and return the exact uncompressed size. Every rule line is spread evenly
+    through the filler; the crash block is written in one piece halfway in.
+    """
+    rng = random.Random(seed)
+    opener = gzip.open if compress else open
+    written = 0
+    line_number = 0
+
+    special = _rule_lines(rng)
+    crash = crash_lines()
+    crash_at = size_bytes // 2
+    # Roughly how many filler lines to put between two detector lines
+    gap = max(1, size_bytes // 110 // (len(special) + 1))
+
+    with opener(path, "wb") as file:
+        def emit(line):
+            nonlocal written, line_number
+            data = (line + "\n").encode("utf-8")
+            file.write(data)
+            written += len(data)
+            line_number += 1
+
+        for line in header_lines(rng, spanish=seed % 2 == 1, local_build=seed % 3 == 2):
+            emit(line)
+
+        while written < size_bytes or special or crash:
+            if crash and written >= crash_at:
+                for line in crash:
+                    emit(line)
+                crash = None
+                continue
+            if special and line_number % gap == 0:
+                emit(special.pop())
+                continue
+            template = FILLER_LINES[rng.randrange(len(FILLER_LINES))]
+            emit(template.format(ts=_timestamp(line_number), n=rng.randrange(1 << 16)))
+
+    return written
+
+def parse_size(text):
+    """'512KB', '10MB', '1GB' or plain bytes."""
+    units = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+    text = text.strip().upper()
+    for suffix, factor in units.items():
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic RPCS3 log for Rock Band 3.")
+    parser.add_argument("path", help="output file; a .gz suffix writes it gzipped")
+    parser.add_argument("--size", default="1MB", help="uncompressed size, e.g. 512KB, 10MB, 1GB (default 1MB)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    written = generate_log(args.path, parse_size(args.size), seed=args.seed, compress=args.path.endswith(".gz"))
+    print(f"Wrote {args.path} ({written} bytes uncompressed)")
+
+if __name__ == "__main__":
+    main()